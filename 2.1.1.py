@@ -1,8 +1,8 @@
 import csv
 import math
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import Font, Border, Side
+from salary_stats import add_salary
+from report_excel import create_workbook, write_sheet, get_column_widths, HEADER, HEADER_PLAIN, CELL, PERCENT
+from vacancies_db import is_database, connect, get_statistic_from_db
 
 name_list = ["name", "salary_from", "salary_to", "salary_currency", "area_name", "published_at"]
 
@@ -40,17 +40,22 @@ class DataSet:
     """Класс для получения и печати статистик.
 
     Attributes:
-        filename (str): Название файла с данными о вакансиях
+        filename (str): Название файла с данными о вакансиях (csv-файл или база данных .db)
         vacancy_name (str): Название выбранной профессии
+        detailed (bool): Считать агрегаты для каждого сочетания года и города
+        cities (dict): Агрегаты зарплат по всем городам
+        years_cities (dict): Агрегаты зарплат по парам (год, город), если detailed
     """
-    def __init__(self, filename, vacancy_name):
+    def __init__(self, filename, vacancy_name, detailed=False):
         """Инициализирует объект DataSet.
 
         Args:
             filename (str): Название файла с данными о вакансиях
             vacancy_name (str): Название выбранной профессии
+            detailed (bool): Считать агрегаты для каждого сочетания года и города
         """
-        self.filename, self.vacancy_name = filename, vacancy_name
+        self.filename, self.vacancy_name, self.detailed = filename, vacancy_name, detailed
+        self.cities, self.years_cities = {}, {}
 
     def csv_reader(self):
         """Считывает данные из входного файла
@@ -58,7 +63,7 @@ class DataSet:
         Returns:
             dict: Все вакансии с информацией о них.
         """
-        with open(self.filename, mode='r', encoding='utf-8-sig') as file:
+        with open(self.filename, mode='r', encoding='utf-8-sig', newline='') as file:
             reader = csv.reader(file)
             header = next(reader)
             header_length = len(header)
@@ -66,70 +71,65 @@ class DataSet:
                 if '' not in row and len(row) == header_length:
                     yield dict(zip(header, row))
 
-    @staticmethod
-    def average(dict):
-        """Высчитывает среднее значение.
+    def get_statistics_from_db(self):
+        """Получает агрегаты зарплат запросами GROUP BY к базе данных вакансий (vacancies.db из 3.5.2).
+        В подробном режиме агрегаты по парам (год, город) считаются одним запросом с группировкой по двум колонкам
 
-        Args:
-            dict (dict): Словарь с значениями
         Returns:
-            dict: Словарь с обновленными, средними значениями
-        """
-        new_dict = {}
-        for k, v in dict.items():
-            new_dict[k] = int(sum(v) / len(v))
-        return new_dict
-
-    @staticmethod
-    def increment(dict, k, с):
-        """Дополняет словарь всех средних зарплат за год или в городе
-
-        Args:
-            dict (dict): Словарь со всеми зарплатами за год или в городе по вакансии
-            k (int): Год или город вакансии, по которому идет подсчет
-            с (list): Средняя зарплата у вакансии
+            dict, dict, dict: Агрегаты по годам, по годам для выбранной профессии, по городам
         """
-        if k in dict:
-            dict[k] += с
-        else:
-            dict[k] = с
+        cnx = connect(self.filename)
+        statistics = get_statistic_from_db(cnx, "year"), get_statistic_from_db(cnx, "year", self.vacancy_name), \
+            get_statistic_from_db(cnx, "area_name")
+        if self.detailed:
+            self.years_cities = get_statistic_from_db(cnx, ["year", "area_name"])
+        cnx.close()
+        return statistics
 
     def get_dynamics(self):
-        """Получает все необходимые статистики для дальнейшей работы
+        """Получает все необходимые статистики для дальнейшей работы за один проход по файлу
+        (или запросами к базе данных, если указан файл .db). Агрегаты по всем городам сохраняются в cities,
+        в подробном режиме агрегаты по парам (год, город) собираются в том же проходе в years_cities
 
         Returns:
             dict, dict, dict, dict, dict, dict: Все необходимые статистики
         """
-        salary = {}
-        salary_of_name = {}
-        city = {}
-        count = 0
-
-        for vacancy_dictionary in self.csv_reader():
-            vacancy = Vacancy(vacancy_dictionary)
-            self.increment(salary, vacancy.publication_year, [vacancy.salary_average])
-            if vacancy.name.find(self.vacancy_name) != -1:
-                self.increment(salary_of_name, vacancy.publication_year, [vacancy.salary_average])
-            self.increment(city, vacancy.area_name, [vacancy.salary_average])
-            count += 1
-
-        number = dict([(k, len(v)) for k, v in salary_of_name.items()])
-        vacancy_number = dict([(k, len(v)) for k, v in salary.items()])
-
-        if not salary_of_name:
-            number = dict([(k, 0) for k, v in vacancy_number.items()])
-            salary_of_name = dict([(k, [0]) for k, v in salary.items()])
+        if is_database(self.filename):
+            salary, salary_of_name, city = self.get_statistics_from_db()
+            count = sum(stats.number for stats in city.values())
+        else:
+            salary, salary_of_name, city = {}, {}, {}
+            count = 0
+            for vacancy_dictionary in self.csv_reader():
+                vacancy = Vacancy(vacancy_dictionary)
+                add_salary(salary, vacancy.publication_year, vacancy.salary_average)
+                if vacancy.name.find(self.vacancy_name) != -1:
+                    add_salary(salary_of_name, vacancy.publication_year, vacancy.salary_average)
+                add_salary(city, vacancy.area_name, vacancy.salary_average)
+                if self.detailed:
+                    add_salary(self.years_cities, (vacancy.publication_year, vacancy.area_name),
+                               vacancy.salary_average)
+                count += 1
+        self.cities = city
+
+        vacancy_number = dict([(k, v.number) for k, v in salary.items()])
+        if salary_of_name:
+            dynamics2, number = dict([(k, v.average()) for k, v in salary_of_name.items()]), \
+                dict([(k, v.number) for k, v in salary_of_name.items()])
+        else:
+            dynamics2, number = dict([(k, 0) for k in vacancy_number]), dict([(k, 0) for k in vacancy_number])
 
-        dynamics1, dynamics2, dynamics3 = self.average(salary), self.average(salary_of_name), self.average(city)
+        dynamics1 = dict([(k, v.average()) for k, v in salary.items()])
+        dynamics3 = dict([(k, v.average()) for k, v in city.items()])
 
         dynamics4 = {}
-        for y, s in city.items():
-            dynamics4[y] = round(len(s) / count, 4)
+        for y, v in city.items():
+            dynamics4[y] = round(v.number / count, 4)
         dynamics4 = list(filter(lambda x: x[-1] >= 0.01, [(k, v) for k, v in dynamics4.items()]))
         dynamics4.sort(key=lambda x: x[-1], reverse=True)
         dynamics5 = dict(dynamics4.copy()[:10])
         dynamics4 = dict(dynamics4)
-        dynamics3 = list(filter(lambda x: x[0] in list(dynamics4.keys()), [(k, v) for k, v in dynamics3.items()]))
+        dynamics3 = list(filter(lambda x: x[0] in dynamics4, [(k, v) for k, v in dynamics3.items()]))
         dynamics3.sort(key=lambda x: x[-1], reverse=True)
         dynamics3 = dict(dynamics3[:10])
 
@@ -163,15 +163,18 @@ class InputConnect:
         name_vacancy (str): Название выбранной профессии
     """
     def __init__(self):
-        """Инициализирует объект InputConnect.
+        """Инициализирует объект InputConnect. Подробный отчет добавляет листы со всеми городами
+        и со всеми сочетаниями года и города
         """
         self.filename, self.name_vacancy = input('Введите название файла: '), input('Введите название профессии: ')
+        detailed = input('Подробный отчет (да/нет): ') == 'да'
 
-        dataset = DataSet(self.filename, self.name_vacancy)
+        dataset = DataSet(self.filename, self.name_vacancy, detailed)
         dynamics1, dynamics2, dynamics3, dynamics4, dynamics5, dynamics6 = dataset.get_dynamics()
         dataset.print_statistic(dynamics1, dynamics2, dynamics3, dynamics4, dynamics5, dynamics6)
 
-        report = Report(self.name_vacancy, dynamics1, dynamics2, dynamics3, dynamics4, dynamics5, dynamics6)
+        report = Report(self.name_vacancy, dynamics1, dynamics2, dynamics3, dynamics4, dynamics5, dynamics6,
+                        dataset.cities if detailed else None, dataset.years_cities if detailed else None)
         report.generate_excel()
 
 
@@ -179,7 +182,6 @@ class Report:
     """Класс для получения отчета по полученным динамикам.
 
     Attributes:
-        workbook (Workbook()): Рабочая книга для получания xlsx-файла
         name_vacancy (str): Название выбранной профессии
         dynamics1 (dict): Динамика уровня зарплат по годам
         dynamics2 (dict): Динамика количества вакансий по годам
@@ -187,9 +189,12 @@ class Report:
         dynamics4 (dict): Динамика количества вакансий по годам для выбранной профессии
         dynamics5 (dict): Уровень зарплат по городам (в порядке убывания)
         dynamics6 (dict): Доля вакансий по городам (в порядке убывания)
+        cities (dict): Агрегаты зарплат по всем городам, None - без подробных листов
+        years_cities (dict): Агрегаты зарплат по парам (год, город), None - без подробных листов
     """
-    def __init__(self, name_vacancy, dynamics1, dynamics2, dynamics3, dynamics4, dynamics5, dynamics6):
-        """Инициализирует объект Report и получает объект Workbook.
+    def __init__(self, name_vacancy, dynamics1, dynamics2, dynamics3, dynamics4, dynamics5, dynamics6,
+                 cities=None, years_cities=None):
+        """Инициализирует объект Report.
 
         Args:
             name_vacancy (str): Название выбранной профессии
@@ -199,75 +204,59 @@ class Report:
             dynamics4 (dict): Динамика количества вакансий по годам для выбранной профессии
             dynamics5 (dict): Уровень зарплат по городам (в порядке убывания)
             dynamics6 (dict): Доля вакансий по городам (в порядке убывания)
+            cities (dict): Агрегаты зарплат по всем городам
+            years_cities (dict): Агрегаты зарплат по парам (год, город)
         """
-        self.workbook = Workbook()
         self.name_vacancy = name_vacancy
         self.dynamics1, self.dynamics2, self.dynamics3, self.dynamics4, self.dynamics5, self.dynamics6 \
             = dynamics1, dynamics2, dynamics3, dynamics4, dynamics5, dynamics6
+        self.cities, self.years_cities = cities, years_cities
+
+    def generate_excel(self, file_name='report.xlsx'):
+        """Генерирует две страницы в рабочей книге с статистикой по годам и статистикой по городам, после чего сохраняет рабочую книгу в файл report.xlsx.
+        Книга пишется в режиме только для записи за один проход, стили ячеек общие и назначаются при добавлении строк
 
-    def generate_excel(self):
-        """Генерирует две страницы в рабочей книге с статистикой по годам и статистикой по городам, после чего сохраняет рабочую книгу в файл report.xlsx
+        Args:
+            file_name (str): Название xlsx файла
+        """
+        workbook = create_workbook()
+        header = ['Год', 'Средняя зарплата', 'Средняя зарплата - ' + self.name_vacancy, 'Количество вакансий',
+                  'Количество вакансий - ' + self.name_vacancy]
+        write_sheet(workbook, 'Статистика по годам', header,
+                    ([year, self.dynamics1[year], self.dynamics3[year], self.dynamics2[year], self.dynamics4[year]]
+                     for year in self.dynamics1.keys()),
+                    get_column_widths([[cell + ' ' for cell in header]]), [CELL] * len(header))
+
+        header = ['Город', 'Уровень зарплат', '', 'Город', 'Доля вакансий']
+        rows = [[city1, value1, '', city2, value2]
+                for (city1, value1), (city2, value2) in zip(self.dynamics5.items(), self.dynamics6.items())]
+        write_sheet(workbook, 'Статистика по городам', header, rows, get_column_widths([header] + rows),
+                    [CELL, CELL, None, CELL, PERCENT], [HEADER, HEADER, HEADER_PLAIN, HEADER, HEADER])
+
+        if self.cities is not None:
+            self.write_detail_sheets(workbook)
+        workbook.save(file_name)
+
+    def write_detail_sheets(self, workbook):
+        """Добавляет листы со статистикой по всем городам и по всем сочетаниям года и города.
+        Строки создаются генератором и сразу пишутся в лист, поэтому время и память не зависят от стилей ячеек
+
+        Args:
+            workbook (Workbook): Рабочая книга из create_workbook
         """
-        work_sheet1 = self.workbook.active
-        work_sheet1.title = 'Статистика по годам'
-        work_sheet1.append(['Год', 'Средняя зарплата', 'Средняя зарплата - ' + self.name_vacancy, 'Количество вакансий', 'Количество вакансий - ' + self.name_vacancy])
-        for year in self.dynamics1.keys():
-            work_sheet1.append([year, self.dynamics1[year], self.dynamics3[year], self.dynamics2[year], self.dynamics4[year]])
-
-        data = [['Год ', 'Средняя зарплата ', ' Средняя зарплата - ' + self.name_vacancy, ' Количество вакансий', ' Количество вакансий - ' + self.name_vacancy]]
-        column_widths = []
-        for row in data:
-            for i, cell in enumerate(row):
-                if len(column_widths) > i:
-                    if len(cell) > column_widths[i]:
-                        column_widths[i] = len(cell)
-                else:
-                    column_widths += [len(cell)]
-
-        for i, column_width in enumerate(column_widths, 1):  # ,1 to start at 1
-            work_sheet1.column_dimensions[get_column_letter(i)].width = column_width + 2
-
-        data = []
-        data.append(['Город', 'Уровень зарплат', '', 'Город', 'Доля вакансий'])
-        for (city1, value1), (city2, value2) in zip(self.dynamics5.items(), self.dynamics6.items()):
-            data.append([city1, value1, '', city2, value2])
-        work_sheet2 = self.workbook.create_sheet('Статистика по городам')
-        for row in data:
-            work_sheet2.append(row)
-
-        column_widths = []
-        for row in data:
-            for i, cell in enumerate(row):
-                cell = str(cell)
-                if len(column_widths) > i:
-                    if len(cell) > column_widths[i]:
-                        column_widths[i] = len(cell)
-                else:
-                    column_widths += [len(cell)]
-
-        for i, column_width in enumerate(column_widths, 1):  # ,1 to start at 1
-            work_sheet2.column_dimensions[get_column_letter(i)].width = column_width + 2
-
-        bold = Font(bold=True)
-        for column in 'ABCDE':
-            work_sheet1[column + '1'].font = bold
-            work_sheet2[column + '1'].font = bold
-
-        for index, _ in enumerate(self.dynamics5):
-            work_sheet2['E' + str(index + 2)].number_format = '0.00%'
-
-        slim = Side(border_style='thin', color='00000000')
-
-        for row in range(len(data)):
-            for column in 'ABDE':
-                work_sheet2[column + str(row + 1)].border = Border(left=slim, bottom=slim, right=slim, top=slim)
-
-        self.dynamics1[1] = 1
-        for row, _ in enumerate(self.dynamics1):
-            for column in 'ABCDE':
-                work_sheet1[column + str(row + 1)].border = Border(left=slim, bottom=slim, right=slim, top=slim)
-
-        self.workbook.save('report.xlsx')
+        total = sum(stats.number for stats in self.cities.values())
+        cities = sorted(self.cities.items(), key=lambda city: city[1].number, reverse=True)
+        header = ['Город', 'Уровень зарплат', 'Количество вакансий', 'Доля вакансий']
+        write_sheet(workbook, 'Все города', header,
+                    ([area_name, stats.average(), stats.number, stats.number / total] for area_name, stats in cities),
+                    get_column_widths([header] + [[area_name] for area_name in self.cities]),
+                    [CELL, CELL, CELL, PERCENT])
+
+        years_cities = sorted((self.years_cities or {}).items(), key=lambda item: (item[0][0], -item[1].number))
+        header = ['Год', 'Город', 'Уровень зарплат', 'Количество вакансий']
+        write_sheet(workbook, 'Города по годам', header,
+                    ([year, area_name, stats.average(), stats.number] for (year, area_name), stats in years_cities),
+                    get_column_widths([header] + [['', area_name] for area_name in self.cities]), [CELL] * len(header))
 
 
 if __name__ == '__main__':
@@ -1,4 +1,5 @@
-from pandas import set_option, read_csv
+from pandas import set_option
+from vacancies_io import split_csv_by_year
 
 set_option("display.max_columns", False)
 set_option("expand_frame_repr", False)
@@ -11,12 +12,7 @@ def split_by_year(path_to_file):
     Args:
         path_to_file (str): Путь к входному csv-файлу
     """
-    data_of_file = read_csv(path_to_file)
-    data_of_file["year"] = data_of_file["published_at"].apply(lambda x: x[:4])
-    data_of_file = data_of_file.groupby("year")
-    for year, data in data_of_file:
-        data[["name", "salary_from", "salary_to", "salary_currency", "area_name", "published_at"]].\
-            to_csv(rf"data\csv_by_years\year_number_{year}.csv", index=False)
+    split_csv_by_year(path_to_file, "data\\csv_by_years")
 
 
 split_by_year("data\\vacancies.csv")
\ No newline at end of file
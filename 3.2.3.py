@@ -1,18 +1,39 @@
-import multiprocessing
-import cProfile
 import os
-from pandas import read_csv
-import concurrent.futures as con_fut
+from vacancies_io import read_vacancies, split_csv_by_year, get_byte_ranges, aggregate_byte_range
+from name_index import get_name_index
+from vacancies_db import is_database, connect, get_statistic_from_db
+from salary_stats import SalaryStats, get_statistic_by, get_city_dynamics, merge_statistics
+from worker_pool import get_executor, get_workers_count
 
 list_print1 = ['Динамика уровня зарплат по годам: ','Динамика количества вакансий по годам: ',
                       'Динамика уровня зарплат по годам для выбранной профессии: ','Динамика количества вакансий по годам для выбранной профессии: ',
                       'Уровень зарплат по городам (в порядке убывания): ','Доля вакансий по городам (в порядке убывания): ']
+
+
+def get_statistic_by_year(file_csv, name_vacancy):
+    """Составляет статистику по году
+
+    Args:
+        file_csv (str): Название файла с данными о вакансиях за год
+        name_vacancy (str): Название выбранной профессии
+    Returns:
+        int, [SalaryStats, SalaryStats]: год, [агрегат зарплат всех вакансий, для профессии]
+    """
+    data_of_file = read_vacancies(file_csv, cache_dir=None)
+    data_of_file["salary"] = data_of_file[["salary_from", "salary_to"]].mean(axis=1)
+    data_of_file_vacancy = data_of_file[data_of_file["name"].str.contains(name_vacancy, regex=False)]
+
+    return int(data_of_file["year"].values[0]), [SalaryStats.from_series(data_of_file["salary"]),
+                                                 SalaryStats.from_series(data_of_file_vacancy["salary"])]
+
+
 class Solution:
     """Класс для получения и печати статистик
 
     Attributes:
         path_to_file (str): Путь к входному csv-файлу
         name_vacancy (str): Название выбранной профессии
+        statistic_by_year (dict): Агрегаты зарплат по годам: все вакансии, выбранная профессия
         dynamics1 (dict): Динамика уровня зарплат по годам
         dynamics2 (dict): Динамика количества вакансий по годам
         dynamics3 (dict): Динамика уровня зарплат по годам для выбранной профессии
@@ -29,6 +50,7 @@ class Solution:
         """
         self.path_to_file = path_to_file
         self.name_vacancy = name_vacancy
+        self.statistic_by_year = {}
         self.dynamics1 = {}
         self.dynamics2 = {}
         self.dynamics3 = {}
@@ -37,49 +59,60 @@ class Solution:
         self.dynamics6 = {}
 
     def split_by_year(self):
-        """Разделяет входной файл на меньшие, группирует по годам
+        """Разделяет входной файл на меньшие, группирует по годам (для базы данных не требуется)
         """
+        if is_database(self.path_to_file):
+            return
+        split_csv_by_year(self.path_to_file, "data\\csv_by_years")
 
-        data_of_file = read_csv(self.path_to_file)
-        data_of_file["year"] = data_of_file["published_at"].apply(lambda x: x[:4])
-        data_of_file = data_of_file.groupby("year")
-        for year, data in data_of_file:
-            data[["name", "salary_from", "salary_to", "salary_currency", "area_name", "published_at"]]. \
-                to_csv(rf"data\csv_by_years\year_number_{year}.csv", index=False)
-
-    def get_dynamics(self):
+    def get_dynamics(self, in_memory=False):
         """Получение динамик
+
+        Args:
+            in_memory (bool): Считать статистики по годам в памяти, без разделения входного файла по годам
         """
-        self.get_dynamics_by_year_with_multiprocessing()
-        self.get_dynamics_by_city()
+        if is_database(self.path_to_file):
+            self.get_dynamics_from_db()
+        else:
+            if in_memory:
+                self.get_dynamics_by_year_in_memory()
+            else:
+                self.get_dynamics_by_year_with_multiprocessing()
+            self.get_dynamics_by_city()
 
     def get_statistic_by_year(self, file_csv):
-        """Составляет статистику по году
+        """Составляет статистику по году для выбранной профессии
 
         Args:
             file_csv (str): Название файла с данными о вакансиях за год
         Returns:
-            str, [int, int, int, int]: год, [ср. зп, всего вакансий, ср. зп для профессии, вакансий по профессии]
+            int, list: год, список агрегатов SalaryStats
         """
-        data_of_file = read_csv(file_csv)
-        data_of_file["salary"] = data_of_file[["salary_from", "salary_to"]].mean(axis=1)
-        data_of_file["published_at"] = data_of_file["published_at"].apply(lambda s: int(s[:4]))
-        data_of_file_vacancy = data_of_file[data_of_file["name"].str.contains(self.name_vacancy)]
-
-        return data_of_file["published_at"].values[0], [int(data_of_file["salary"].mean()), len(data_of_file),
-                                              int(data_of_file_vacancy["salary"].mean() if len(data_of_file_vacancy) != 0 else 0), len(data_of_file_vacancy)]
+        return get_statistic_by_year(file_csv, self.name_vacancy)
 
     def add_elements_to_dynamics(self, result):
-        """Добавляет значения в динамики по годам
+        """Объединяет частичные агрегаты по годам текущего подсчета и заменяет ими агрегаты
+        и динамики по годам, посчитанные ранее
 
         Args:
-            result (list): Список значений для динамик
+            result (list): Список пар (год, список агрегатов SalaryStats)
         """
-        for year, data_dynamics in result:
-            self.dynamics1[year] = data_dynamics[0]
-            self.dynamics2[year] = data_dynamics[1]
-            self.dynamics3[year] = data_dynamics[2]
-            self.dynamics4[year] = data_dynamics[3]
+        statistic_by_year = {}
+        for year, statistics in result:
+            if year in statistic_by_year:
+                for stats, other in zip(statistic_by_year[year], statistics):
+                    stats.merge(other)
+            else:
+                statistic_by_year[year] = statistics
+        self.statistic_by_year = statistic_by_year
+
+        self.dynamics1, self.dynamics2, self.dynamics3, self.dynamics4 = {}, {}, {}, {}
+        for year in sorted(self.statistic_by_year):
+            statistics = self.statistic_by_year[year]
+            self.dynamics1[year] = statistics[0].average()
+            self.dynamics2[year] = statistics[0].number
+            self.dynamics3[year] = statistics[1].average()
+            self.dynamics4[year] = statistics[1].number
 
     def get_dynamics_by_year_not_with_multiprocessing(self):
         """Получает статистики по годам с использованием только одиного процесса
@@ -95,9 +128,7 @@ class Solution:
         """Получает статистики по годам с использованием нескольких процессов
         """
         files = [rf"data\csv_by_years\{file_name}" for file_name in os.listdir(rf"data\csv_by_years")]
-        pool = multiprocessing.Pool(4)
-        result = pool.starmap(self.get_statistic_by_year, [(file,) for file in files])
-        pool.close()
+        result = list(get_executor().map(get_statistic_by_year, files, [self.name_vacancy] * len(files)))
 
         self.add_elements_to_dynamics(result)
 
@@ -105,30 +136,64 @@ class Solution:
         """Получает статистики по годам с использованием модуля concurrent futures
         """
         files = [rf"data\csv_by_years\{file_name}" for file_name in os.listdir("data\csv_by_years")]
-        with con_fut.ProcessPoolExecutor(max_workers=4) as executer:
-            res = executer.map(self.get_statistic_by_year, files)
-        result = list(res)
+        result = list(get_executor().map(get_statistic_by_year, files, [self.name_vacancy] * len(files)))
 
         self.add_elements_to_dynamics(result)
 
-    def get_dynamics_by_city(self):
-        """Получает статистики по городам
+    def get_dynamics_by_year_in_memory(self):
+        """Получает статистики по годам за одно чтение входного файла одной группировкой по году,
+        без разделения на файлы по годам
         """
-        data_of_file = read_csv(self.path_to_file)
-        total = len(data_of_file)
+        data_of_file = read_vacancies(self.path_to_file)
         data_of_file["salary"] = data_of_file[["salary_from", "salary_to"]].mean(axis=1)
-        data_of_file["count"] = data_of_file.groupby("area_name")["area_name"].transform("count")
-        data_of_file = data_of_file[data_of_file["count"] > total * 0.01]
-        data_of_file = data_of_file.groupby("area_name", as_index=False)
-        data_of_file = data_of_file[["salary", "count"]].mean().sort_values("salary", ascending=False)
-        data_of_file["salary"] = data_of_file["salary"].apply(lambda s: int(s))
+        data_of_file_vacancy = data_of_file.iloc[get_name_index(self.path_to_file).find_rows(self.name_vacancy)]
+
+        statistic = get_statistic_by(data_of_file, "year")
+        statistic_vacancy = get_statistic_by(data_of_file_vacancy, "year")
+        self.add_elements_to_dynamics([(year, [stats, statistic_vacancy.get(year, SalaryStats())])
+                                       for year, stats in statistic.items()])
 
-        self.dynamics5 = dict(zip(data_of_file.head(10)["area_name"], data_of_file.head(10)["salary"]))
+    def get_dynamics_by_byte_ranges(self, parts=None):
+        """Получает все статистики, разделив входной файл на диапазоны байт по числу процессов.
+        Каждый процесс считает частичные агрегаты своего диапазона, после чего они объединяются,
+        поэтому нагрузка распределяется равномерно независимо от количества вакансий в каждом году
+
+        Args:
+            parts (int): Количество диапазонов, по умолчанию - количество рабочих процессов
+        """
+        executer = get_executor()
+        byte_ranges = get_byte_ranges(self.path_to_file, parts or get_workers_count(), executer.map)
+        partials = list(executer.map(aggregate_byte_range, [self.path_to_file] * len(byte_ranges),
+                                     [start for start, _ in byte_ranges], [end for _, end in byte_ranges],
+                                     [self.name_vacancy] * len(byte_ranges)))
+        years = merge_statistics([partial[0] for partial in partials])
+        cities = merge_statistics([partial[1] for partial in partials])
+        years_vacancy = merge_statistics([partial[2] for partial in partials])
+
+        self.add_elements_to_dynamics([(year, [stats, years_vacancy.get(year, SalaryStats())])
+                                       for year, stats in years.items()])
+        self.dynamics5, self.dynamics6 = get_city_dynamics(cities)
+
+    def get_dynamics_from_db(self):
+        """Получает все статистики запросами GROUP BY к базе данных вакансий (vacancies.db из 3.5.2),
+        не загружая вакансии в память
+        """
+        cnx = connect(self.path_to_file)
+        statistic = get_statistic_from_db(cnx, "year")
+        statistic_vacancy = get_statistic_from_db(cnx, "year", self.name_vacancy)
+        cities = get_statistic_from_db(cnx, "area_name")
+        cnx.close()
 
-        data_of_file = data_of_file.sort_values("count", ascending=False)
-        data_of_file["count"] = round(data_of_file["count"] / total, 4)
+        self.add_elements_to_dynamics([(year, [stats, statistic_vacancy.get(year, SalaryStats())])
+                                       for year, stats in statistic.items()])
+        self.dynamics5, self.dynamics6 = get_city_dynamics(cities)
 
-        self.dynamics6 = dict(zip(data_of_file.head(10)["area_name"], data_of_file.head(10)["count"]))
+    def get_dynamics_by_city(self):
+        """Получает статистики по городам
+        """
+        data_of_file = read_vacancies(self.path_to_file)
+        data_of_file["salary"] = data_of_file[["salary_from", "salary_to"]].mean(axis=1)
+        self.dynamics5, self.dynamics6 = get_city_dynamics(get_statistic_by(data_of_file, "area_name"))
 
     def print_statistic(self):
         """Выводит все динамики с описанием
@@ -142,13 +207,7 @@ class Solution:
 
 
 if __name__ == '__main__':
-    # solve = Solution(input("Введите название файла: "), input("Введите название профессии: "))
-    # solve.split_by_year()
-    # solve.get_dynamics()
-    # solve.print_statistic()
-
-    solve = Solution("data\\vacancies.csv", "Аналитик")
+    solve = Solution(input("Введите название файла: "), input("Введите название профессии: "))
     solve.split_by_year()
-    # cProfile.run("solve.get_dynamics_by_year_not_with_multiprocessing()", sort="cumtime")
-    # cProfile.run("solve.get_dynamics_by_year_with_multiprocessing()", sort="cumtime")
-    cProfile.run("solve.get_dynamics_by_year_with_concurrent_futures()", sort="cumtime")
\ No newline at end of file
+    solve.get_dynamics()
+    solve.print_statistic()
@@ -1,6 +1,6 @@
 import pandas as pd
-import xmltodict
-import requests
+from cbr_rates import get_rates
+from vacancies_io import split_csv_by_year
 
 
 def get_currency_frequency(data_file):
@@ -17,35 +17,16 @@ def get_currency_frequency(data_file):
 
 
 def get_years_currency(file_name):
-    """Собирает курсы валют за диапазон между самой старой и новой вакансией с частотностью раз в месяц,
-     сохранет полученный результат (формат dataframe) в csv
+    """Собирает курсы валют за диапазон между самой старой и новой вакансией с частотностью раз в месяц
+     (параллельно и с кэшем ответов центробанка на диске), сохранет полученный результат (формат dataframe) в csv
 
     Args:
         file_name (str): Путь к файлу vacancies_dif_currencies.csv
     """
     data_file = pd.read_csv(file_name)
-    result = pd.DataFrame()
     currency_dict = get_currency_frequency(data_file)
     data_file = data_file[data_file["salary_currency"].isin(currency_dict)]
-    range_date = [data_file["published_at"].min().split("-")[:2], data_file["published_at"].max().split("-")[:2]]
-    row = {}
-    for year in range(int(range_date[0][0]), int(range_date[1][0]) + 1):
-        for month in range(int(range_date[0][1]), 13):
-            print(year, month)
-            try:
-                response = requests.get(r"http://www.cbr.ru/scripts/XML_daily.asp?date_req=01/{0}/{1}"
-                                        .format(str(month).zfill(2), year))
-            except Exception:
-                continue
-
-            response = xmltodict.parse(response.text)
-            for i in response['ValCurs']['Valute']:
-                if i['CharCode'] in currency_dict:
-                    row["date"] = "{0}-{1}".format(year, str(month).zfill(2))
-                    row[i['CharCode']] = round(float(i["Value"].replace(",", ".")) / int(i["Nominal"]), 7)
-            result = pd.concat([result, pd.DataFrame([row])])
-            if year == int(range_date[1][0]) and month == int(range_date[1][1]) or month == 12:
-                break
+    result = get_rates(data_file["published_at"].min()[:7], data_file["published_at"].max()[:7], currency_dict)
 
     result.to_csv("currency.csv", index=False)
 
@@ -56,12 +37,7 @@ def split_by_year(path_to_file):
     Args:
         path_to_file (str): Путь к входному csv-файлу
     """
-    data_of_file = pd.read_csv(path_to_file)
-    data_of_file["year"] = data_of_file["published_at"].apply(lambda x: x[:4])
-    data_of_file = data_of_file.groupby("year")
-    for year, data in data_of_file:
-        data[["name", "salary_from", "salary_to", "salary_currency", "area_name", "published_at"]].\
-            to_csv(rf"data\csv_by_years_dif_currencies\year_number_{year}.csv", index=False)
+    split_csv_by_year(path_to_file, "data\\csv_by_years_dif_currencies")
 
 
 get_years_currency('data\\vacancies_dif_currencies.csv')
@@ -1,52 +1,65 @@
+import time
 import pandas as pd
-from math import isnan
+from currency_db import CurrencyRates, convert_salaries
+from vacancies_io import print_progress
 
 
-def get_average_salary(row):
-    """Возращает значение для поля salary в зависимости от заполненности полей salary_from, salary_to
+def get_average_salary(data_file):
+    """Возращает значения для поля salary в зависимости от заполненности полей salary_from, salary_to
 
     Args:
-        row (Series): Строка в data_file
+        data_file (DataFrame): Данные из файла vacancies_dif_currencies.csv
     Returns:
-        float: Значение для ячейки 'salary'
+        Series: Значения для колонки 'salary' (NaN, если оба поля пустые)
     """
-    cell_values = []
-    cell_values += [row["salary_from"]] if not isnan(row["salary_from"]) else []
-    cell_values += [row["salary_to"]] if not isnan(row["salary_to"]) else []
-    if len(cell_values) != 0:
-        return sum(cell_values) / len(cell_values)
-    return
+    return data_file[["salary_from", "salary_to"]].mean(axis=1)
 
 
-def converting_salaries_into_rubles(row):
-    """Переводит значение salary в рубли после сравнения даты появления вакансии
-    с датой в файле currency.csv
+def get_currency_rates(file_name="currency.csv"):
+    """Считывает курсы валют один раз в плотную таблицу (месяц, валюта) -> курс
 
     Args:
-        row (Series): Строка в data_file
+        file_name (str): Путь к файлу currency.csv
     Returns:
-        float: Значение для ячейки 'salary' в рублях
+        CurrencyRates: Курсы валют
     """
-    convert = pd.read_csv("currency.csv")
-    if row["salary_currency"] in convert.columns:
-        answer = row["salary"] * float(convert[convert["date"] == row["published_at"][:7]][row["salary_currency"]])
-        return round(answer, 2)
-    return row["salary"]
+    return CurrencyRates.from_frame(pd.read_csv(file_name))
 
 
-def currency_conversion(file_name):
-    """Обрабатывает данные из колонок salary_from, salary_to, salary_currency и объединяет в колонку salary
+def converting_salaries_into_rubles(data_file, rates):
+    """Переводит значения salary в рубли, выбирая курсы из плотной таблицы по номеру месяца публикации и валюты
+
+    Args:
+        data_file (DataFrame): Данные с колонками salary, salary_currency, published_at
+        rates (CurrencyRates): Курсы валют из get_currency_rates
+    Returns:
+        Series: Значения для колонки 'salary' в рублях
+    """
+    rate = rates.get_rates(data_file["published_at"], data_file["salary_currency"])
+    is_converted = rates.get_codes(data_file["salary_currency"]) >= 0
+    return pd.Series(convert_salaries(data_file["salary"].to_numpy(), rate, is_converted), index=data_file.index)
+
+
+def currency_conversion(file_name, output_name="100_vacancies.csv", rows_limit=100, chunksize=100000):
+    """Обрабатывает данные из колонок salary_from, salary_to, salary_currency и объединяет в колонку salary.
+    Файл читается частями по chunksize строк, каждая часть переводится в рубли и дописывается в выходной файл,
+    поэтому память не зависит от размера входного файла
 
     Args:
         file_name: Путь к файлу vacancies_dif_currencies.csv
+        output_name (str): Путь к выходному csv-файлу
+        rows_limit (int): Количество первых вакансий для обработки, None - все вакансии
+        chunksize (int): Количество строк в одной части
     """
-    data_file = pd.read_csv(file_name)
-    answer = data_file.loc[0:99].copy()
-    answer["salary"] = answer.apply(lambda row: get_average_salary(row), axis=1)
-    answer["salary"] = answer.apply(lambda row: converting_salaries_into_rubles(row), axis=1)
-    answer.drop(labels=["salary_from", "salary_to", "salary_currency"], axis=1, inplace=True)
-    answer = answer[["name", "salary", "area_name", "published_at"]]
-    answer.to_csv("100_vacancies.csv", index=False)
+    rates = get_currency_rates()
+    converted, start_time = 0, time.perf_counter()
+    for chunk in pd.read_csv(file_name, chunksize=chunksize, nrows=rows_limit):
+        chunk["salary"] = get_average_salary(chunk)
+        chunk["salary"] = converting_salaries_into_rubles(chunk, rates)
+        chunk[["name", "salary", "area_name", "published_at"]]\
+            .to_csv(output_name, mode="w" if converted == 0 else "a", header=converted == 0, index=False)
+        converted += len(chunk)
+        print_progress(converted, start_time)
 
 
-currency_conversion('data\\vacancies_dif_currencies.csv')
\ No newline at end of file
+currency_conversion('data\\vacancies_dif_currencies.csv')
@@ -1,12 +1,15 @@
-import multiprocessing
 import cProfile
 import os
+from vacancies_io import read_vacancies, split_csv_by_year
+from name_index import get_name_index
+from vacancies_db import is_database, connect, get_statistic_from_db
+from salary_stats import SalaryStats, get_statistic_by, get_city_dynamics
+from worker_pool import get_executor
+from report_charts import render_chart
+from report_pdf import write_pdf
+from report_templates import render_template, print_render_timings
+from multi_pattern import AhoCorasick
 import pandas as pd
-import matplotlib.pyplot as plt
-import numpy as np
-from jinja2 import Environment, FileSystemLoader
-import pathlib
-import pdfkit
 
 list_print1 = ['Динамика уровня зарплат по годам: ','Динамика количества вакансий по годам: ',
                'Динамика уровня зарплат по годам для выбранной профессии: ', 'Динамика количества вакансий по годам для выбранной профессии: ',
@@ -15,6 +18,27 @@ list_print1 = ['Динамика уровня зарплат по годам: ',
                'Динамика количества вакансий по годам для выбранной профессии и региона: ']
 
 
+def get_statistic_by_year(file_csv, name_vacancy, area_name):
+    """Составляет статистику по году
+
+    Args:
+        file_csv (str): Название файла с данными о вакансиях за год
+        name_vacancy (str): Название выбранной профессии
+        area_name (str): Название выбранного региона
+    Returns:
+        int, [SalaryStats, SalaryStats, SalaryStats]: год, [агрегат зарплат всех вакансий, для профессии,
+        для профессии и региона]
+    """
+    data_of_file = read_vacancies(file_csv, cache_dir=None)
+    data_of_file["salary"] = data_of_file[["salary_from", "salary_to"]].mean(axis=1)
+    data_of_file_vacancy = data_of_file[data_of_file["name"].str.contains(name_vacancy, case=False, regex=False)]
+    data_of_file_vacancy_area = data_of_file_vacancy[data_of_file_vacancy["area_name"].str.contains(area_name, regex=False)]
+
+    return int(data_of_file["year"].values[0]), [SalaryStats.from_series(data_of_file["salary"]),
+                                                 SalaryStats.from_series(data_of_file_vacancy["salary"]),
+                                                 SalaryStats.from_series(data_of_file_vacancy_area["salary"])]
+
+
 class Solution:
     """Класс для получения и печати статистик
 
@@ -22,6 +46,7 @@ class Solution:
         path_to_file (str): Путь к входному csv-файлу
         name_vacancy (str): Название выбранной профессии
         area_name (str): Название выбранного региона
+        statistic_by_year (dict): Агрегаты зарплат по годам: все вакансии, выбранная профессия, профессия и регион
         dynamics1 (dict): Динамика уровня зарплат по годам
         dynamics2 (dict): Динамика количества вакансий по годам
         dynamics3 (dict): Динамика уровня зарплат по годам для выбранной профессии
@@ -42,6 +67,7 @@ class Solution:
         self.path_to_file = path_to_file
         self.name_vacancy = name_vacancy
         self.area_name = area_name
+        self.statistic_by_year = {}
         self.dynamics1 = {}
         self.dynamics2 = {}
         self.dynamics3 = {}
@@ -52,75 +78,112 @@ class Solution:
         self.dynamics8 = {}
 
     def split_by_year(self):
-        """Разделяет входной файл на меньшие, группирует по годам
+        """Разделяет входной файл на меньшие, группирует по годам (для базы данных не требуется)
         """
-        data_of_file = pd.read_csv(self.path_to_file)
-        data_of_file["year"] = data_of_file["published_at"].apply(lambda x: x[:4])
-        data_of_file = data_of_file.groupby("year")
-        for year, data in data_of_file:
-            data[["name", "salary_from", "salary_to", "salary_currency", "area_name", "published_at"]]. \
-                to_csv(rf"data\csv_by_years_dif_currencies\year_number_{year}.csv", index=False)
+        if is_database(self.path_to_file):
+            return
+        split_csv_by_year(self.path_to_file, "data\\csv_by_years_dif_currencies")
 
-    def get_dynamics(self):
+    def get_dynamics(self, in_memory=False):
         """Получение динамик
+
+        Args:
+            in_memory (bool): Считать статистики по годам в памяти, без разделения входного файла по годам
         """
-        self.get_dynamics_by_year_with_multiprocessing()
-        self.get_dynamics_by_city()
+        if is_database(self.path_to_file):
+            self.get_dynamics_from_db()
+        else:
+            if in_memory:
+                self.get_dynamics_by_year_in_memory()
+            else:
+                self.get_dynamics_by_year_with_multiprocessing()
+            self.get_dynamics_by_city()
         return self.dynamics1, self.dynamics2, self.dynamics3, self.dynamics4, self.dynamics5, self.dynamics6, self.dynamics7, self.dynamics8
 
     def get_statistic_by_year(self, file_csv):
-        """Составляет статистику по году
+        """Составляет статистику по году для выбранной профессии
+
         Args:
             file_csv (str): Название файла с данными о вакансиях за год
         Returns:
-            str, [int, int, int, int, int, int]: год, [ср. зп, всего вакансий, ср. зп для профессии,
-            вакансий по профессии, ср. зп для профессии и региона, вакансий по профессии и региону]
+            int, list: год, список агрегатов SalaryStats
         """
-        data_of_file = pd.read_csv(file_csv)
-        data_of_file["salary"] = data_of_file[["salary_from", "salary_to"]].mean(axis=1)
-        data_of_file["published_at"] = data_of_file["published_at"].apply(lambda s: int(s[:4]))
-        data_of_file_vacancy = data_of_file[data_of_file["name"].str.contains(self.name_vacancy, case=False)]
-        data_of_file_vacancy_area = data_of_file_vacancy[data_of_file_vacancy["area_name"].str.contains(self.area_name)]
+        return get_statistic_by_year(file_csv, self.name_vacancy, self.area_name)
 
-        return data_of_file["published_at"].values[0], [int(data_of_file["salary"].mean()), len(data_of_file),
-                                                        int(data_of_file_vacancy["salary"].mean() if len(data_of_file_vacancy) != 0 else 0),
-                                                        len(data_of_file_vacancy),
-                                                        int(data_of_file_vacancy_area["salary"].mean() if len(data_of_file_vacancy_area) != 0 else 0),
-                                                        len(data_of_file_vacancy_area)]
+    def add_elements_to_dynamics(self, result):
+        """Объединяет частичные агрегаты по годам текущего подсчета и заменяет ими агрегаты
+        и динамики по годам, посчитанные ранее
+
+        Args:
+            result (list): Список пар (год, список агрегатов SalaryStats)
+        """
+        statistic_by_year = {}
+        for year, statistics in result:
+            if year in statistic_by_year:
+                for stats, other in zip(statistic_by_year[year], statistics):
+                    stats.merge(other)
+            else:
+                statistic_by_year[year] = statistics
+        self.statistic_by_year = statistic_by_year
+
+        self.dynamics1, self.dynamics2, self.dynamics3, self.dynamics4 = {}, {}, {}, {}
+        self.dynamics7, self.dynamics8 = {}, {}
+        for year in sorted(self.statistic_by_year):
+            statistics = self.statistic_by_year[year]
+            self.dynamics1[year] = statistics[0].average()
+            self.dynamics2[year] = statistics[0].number
+            self.dynamics3[year] = statistics[1].average()
+            self.dynamics4[year] = statistics[1].number
+            self.dynamics7[year] = statistics[2].average()
+            self.dynamics8[year] = statistics[2].number
 
     def get_dynamics_by_year_with_multiprocessing(self):
         """Получает статистики по годам с использованием нескольких процессов
         """
         files = [rf"data\csv_by_years_dif_currencies\{file_name}" for file_name in os.listdir(rf"data\csv_by_years_dif_currencies")]
-        pool = multiprocessing.Pool(4)
-        result = pool.starmap(self.get_statistic_by_year, [(file,) for file in files])
-        pool.close()
-        for year, data_dynamics in result:
-            self.dynamics1[year] = data_dynamics[0]
-            self.dynamics2[year] = data_dynamics[1]
-            self.dynamics3[year] = data_dynamics[2]
-            self.dynamics4[year] = data_dynamics[3]
-            self.dynamics7[year] = data_dynamics[4]
-            self.dynamics8[year] = data_dynamics[5]
+        result = list(get_executor().map(get_statistic_by_year, files, [self.name_vacancy] * len(files),
+                                         [self.area_name] * len(files)))
+
+        self.add_elements_to_dynamics(result)
+
+    def get_dynamics_by_year_in_memory(self):
+        """Получает статистики по годам за одно чтение входного файла одной группировкой по году,
+        без разделения на файлы по годам
+        """
+        data_of_file = read_vacancies(self.path_to_file)
+        data_of_file["salary"] = data_of_file[["salary_from", "salary_to"]].mean(axis=1)
+        data_of_file_vacancy = data_of_file.iloc[get_name_index(self.path_to_file).find_rows(self.name_vacancy, case=False)]
+        data_of_file_vacancy_area = data_of_file_vacancy[data_of_file_vacancy["area_name"].str.contains(self.area_name, regex=False)]
+
+        statistic = get_statistic_by(data_of_file, "year")
+        statistic_vacancy = get_statistic_by(data_of_file_vacancy, "year")
+        statistic_vacancy_area = get_statistic_by(data_of_file_vacancy_area, "year")
+        self.add_elements_to_dynamics([(year, [stats, statistic_vacancy.get(year, SalaryStats()),
+                                               statistic_vacancy_area.get(year, SalaryStats())])
+                                       for year, stats in statistic.items()])
+
+    def get_dynamics_from_db(self):
+        """Получает все статистики запросами GROUP BY к базе данных вакансий (vacancies.db из 3.5.2),
+        не загружая вакансии в память
+        """
+        cnx = connect(self.path_to_file)
+        statistic = get_statistic_from_db(cnx, "year")
+        statistic_vacancy = get_statistic_from_db(cnx, "year", self.name_vacancy, case=False)
+        statistic_vacancy_area = get_statistic_from_db(cnx, "year", self.name_vacancy, self.area_name, case=False)
+        cities = get_statistic_from_db(cnx, "area_name")
+        cnx.close()
+
+        self.add_elements_to_dynamics([(year, [stats, statistic_vacancy.get(year, SalaryStats()),
+                                               statistic_vacancy_area.get(year, SalaryStats())])
+                                       for year, stats in statistic.items()])
+        self.dynamics5, self.dynamics6 = get_city_dynamics(cities)
 
     def get_dynamics_by_city(self):
         """Получает статистики по городам
         """
-        data_of_file = pd.read_csv(self.path_to_file)
-        total = len(data_of_file)
+        data_of_file = read_vacancies(self.path_to_file)
         data_of_file["salary"] = data_of_file[["salary_from", "salary_to"]].mean(axis=1)
-        data_of_file["count"] = data_of_file.groupby("area_name")["area_name"].transform("count")
-        data_of_file = data_of_file[data_of_file["count"] > total * 0.01]
-        data_of_file = data_of_file.groupby("area_name", as_index=False)
-        data_of_file = data_of_file[["salary", "count"]].mean().sort_values("salary", ascending=False)
-        data_of_file["salary"] = data_of_file["salary"].apply(lambda s: int(s))
-
-        self.dynamics5 = dict(zip(data_of_file.head(10)["area_name"], data_of_file.head(10)["salary"]))
-
-        data_of_file = data_of_file.sort_values("count", ascending=False)
-        data_of_file["count"] = round(data_of_file["count"] / total, 4)
-
-        self.dynamics6 = dict(zip(data_of_file.head(10)["area_name"], data_of_file.head(10)["count"]))
+        self.dynamics5, self.dynamics6 = get_city_dynamics(get_statistic_by(data_of_file, "area_name"))
 
     def print_statistic(self):
         """Выводит все динамики с описанием
@@ -133,6 +196,68 @@ class Solution:
         InputConnect(self.path_to_file, self.name_vacancy, self.dynamics1, self.dynamics2, self.dynamics3, self.dynamics4, self.dynamics5, self.dynamics6)
 
 
+class BatchSolution:
+    """Класс для получения статистик сразу для нескольких профессий за один проход по данным
+
+    Attributes:
+        path_to_file (str): Путь к входному csv-файлу
+        names_vacancy (list): Названия выбранных профессий
+        area_name (str): Название выбранного региона
+        solutions (dict): Объекты Solution с динамиками для каждой профессии
+    """
+    def __init__(self, path_to_file, names_vacancy, area_name=''):
+        """Инициализирует объект BatchSolution.
+
+        Args:
+            path_to_file (str): Путь к входному csv-файлу
+            names_vacancy (list): Названия выбранных профессий
+            area_name (str): Название выбранного региона
+        """
+        self.path_to_file = path_to_file
+        self.names_vacancy = list(dict.fromkeys(names_vacancy))
+        self.area_name = area_name
+        self.solutions = dict([(name, Solution(path_to_file, name, area_name)) for name in self.names_vacancy])
+
+    def get_dynamics(self):
+        """Получение динамик для всех профессий. Каждое уникальное название вакансии один раз проверяется
+        автоматом Ахо-Корасик на вхождение всех профессий, после чего статистики считаются
+        одной группировкой по профессии и году
+        """
+        data_of_file = read_vacancies(self.path_to_file)
+        data_of_file["salary"] = data_of_file[["salary_from", "salary_to"]].mean(axis=1)
+        codes, names = pd.factorize(data_of_file["name"])
+        matcher = AhoCorasick([name.lower() for name in self.names_vacancy])
+        pairs = pd.DataFrame([(code, profession) for code, name in enumerate(names) for profession in matcher.find(name.lower())],
+                             columns=["code", "profession"], dtype="int64")
+
+        data_of_file_vacancy = pd.DataFrame({"code": codes, "year": data_of_file["year"], "salary": data_of_file["salary"],
+                                             "in_area": data_of_file["area_name"].str.contains(self.area_name, regex=False)})
+        data_of_file_vacancy = data_of_file_vacancy.merge(pairs, on="code")
+        statistic = get_statistic_by(data_of_file, "year")
+        statistic_vacancy = get_statistic_by(data_of_file_vacancy, ["profession", "year"])
+        statistic_vacancy_area = get_statistic_by(data_of_file_vacancy[data_of_file_vacancy["in_area"]], ["profession", "year"])
+        dynamics5, dynamics6 = get_city_dynamics(get_statistic_by(data_of_file, "area_name"))
+
+        for profession, name in enumerate(self.names_vacancy):
+            solution = self.solutions[name]
+            solution.add_elements_to_dynamics([(year, [SalaryStats().merge(stats),
+                                                       statistic_vacancy.get((profession, year), SalaryStats()),
+                                                       statistic_vacancy_area.get((profession, year), SalaryStats())])
+                                               for year, stats in statistic.items()])
+            solution.dynamics5, solution.dynamics6 = dict(dynamics5), dict(dynamics6)
+        return self.solutions
+
+    def generate_reports(self):
+        """Генерирует отчет для каждой профессии в файлы report_3_4_3_{номер профессии}.pdf
+        """
+        for index, solution in enumerate(self.solutions.values()):
+            report = Report(solution.name_vacancy, solution.dynamics1, solution.dynamics2, solution.dynamics3,
+                            solution.dynamics4, solution.dynamics5, solution.dynamics6)
+            report.generate_image()
+            report.generate_pdf('report_3_4_3_{0}.pdf'.format(index))
+        print_render_timings()
+
+
 class InputConnect:
     """ Класс для получения контента
 
@@ -192,66 +317,28 @@ class Report:
         self.dynamics5 = dynamics5
         self.dynamics6 = dynamics6
 
-    def generate_image(self):
+    def generate_image(self, image_name=None):
         """Генерирует 4 гистрограммы и сохраняет в png файл:
         1) Диаграмма - уровень зарплат по годам для вывода динамики уровня зарплат по годам как общий,
         так и для выбранной профессии
         2) Диаграмма - количество вакансий по годам как общий, так и для выбранной профессии
         3) Горизонтальная диаграмма - уровень зарплат по городам
         4) Круговая диаграмма - количество вакансий по городам
+
+        Args:
+            image_name (str): Название png файла, None - картинка хранится только в памяти и в кэше диаграмм
         """
-        x = np.arange(len(self.dynamics1.keys()))
-        width = 0.35
-
-        fig, axs = plt.subplots(ncols=2, nrows=2)
-        axs[0, 0].bar(x - width / 2, self.dynamics1.values(), width, label='средняя з/п')
-        axs[0, 0].bar(x + width / 2, self.dynamics3.values(), width, label='з/п {0}'.format(self.name_vacancy))
-        plt.rcParams['font.size'] = '8'
-        for label in (axs[0, 0].get_xticklabels() + axs[0, 0].get_yticklabels()):
-            label.set_fontsize(7)
-        axs[0, 0].set_title('Уровень зарплат по годам')
-        axs[0, 0].set_xticks(x, self.dynamics1.keys(), rotation=90)
-        axs[0, 0].grid(axis='y')
-        axs[0, 0].legend(fontsize=7)
-
-        axs[0, 1].bar(x - width / 2, self.dynamics2.values(), width, label='количество вакансий')
-        axs[0, 1].bar(x + width / 2, self.dynamics4.values(), width,
-                      label='количество вакансий {0}'.format(self.name_vacancy))
-        for label in (axs[0, 1].get_xticklabels() + axs[0, 1].get_yticklabels()):
-            label.set_fontsize(7)
-        axs[0, 1].set_title('Количество вакансий по годам')
-        axs[0, 1].set_xticks(x, self.dynamics2.keys(), rotation=90)
-        axs[0, 1].grid(axis='y')
-        axs[0, 1].legend(fontsize=7)
-        fig.tight_layout()
-
-        areas = []
-        for area in self.dynamics5.keys():
-            areas.append(str(area).replace(' ', '\n').replace('-', '-\n'))
-        y_pos = np.arange(len(areas))
-        performance = self.dynamics5.values()
-        error = np.random.rand(len(areas))
-        axs[1, 0].barh(y_pos, performance, xerr=error, align='center')
-        for label in (axs[1, 0].get_xticklabels() + axs[1, 0].get_yticklabels()):
-            label.set_fontsize(7)
-        axs[1, 0].set_yticks(y_pos, labels=areas, size=7)
-        axs[1, 0].invert_yaxis()
-        axs[1, 0].grid(axis='x')
-        axs[1, 0].set_title('Уровень зарплат по городам')
-
-        val = list(self.dynamics6.values()) + [1 - sum(list(self.dynamics6.values()))]
-        k = list(self.dynamics6.keys()) + ['Другие']
-        axs[1, 1].pie(val, labels=k, startangle=150)
-        axs[1, 1].set_title('Доля вакансий по городам')
-
-        plt.tight_layout()
-        plt.savefig('graph.png', dpi=300)
-
-    def generate_pdf(self):
+        self.image = render_chart(self.name_vacancy, [self.dynamics1, self.dynamics2, self.dynamics3,
+                                                      self.dynamics4, self.dynamics5, self.dynamics6], image_name,
+                                  tick_size=7, legend_size=7, area_size=7)
+
+    def generate_pdf(self, file_name='report_3_4_3.pdf', image_name=None):
         """Генерация pdf файла, в котором содержатся таблицы и png файл
+
+        Args:
+            file_name (str): Название pdf файла
+            image_name (str): Название png файла с гистограммами, None - картинка из generate_image
         """
-        env = Environment(loader=FileSystemLoader('.'))
-        template = env.get_template("pdf_template.html")
         dynamics = []
         for year in self.dynamics2.keys():
             dynamics.append([year, self.dynamics1[year], self.dynamics2[year], self.dynamics3[year], self.dynamics4[year]])
@@ -259,12 +346,9 @@ class Report:
         for key in self.dynamics6:
             self.dynamics6[key] = round(self.dynamics6[key] * 100, 2)
 
-        pdf_template = template.render({'name': self.name_vacancy,
-                                        'path': '{0}/{1}'.format(pathlib.Path(__file__).parent.resolve(), 'graph.png'),
+        pdf_template = render_template({'name': self.name_vacancy, 'path': 'graph.png',
                                         'dynamics': dynamics, 'dynamics5': self.dynamics5, 'dynamics6': self.dynamics6})
-
-        config = pdfkit.configuration(wkhtmltopdf=r'C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe')
-        pdfkit.from_string(pdf_template, 'report_3_4_3.pdf', configuration=config, options={"enable-local-file-access": ""})
+        write_pdf(pdf_template, file_name, {'graph.png': image_name or self.image})
 
 
 if __name__ == '__main__':
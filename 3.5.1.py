@@ -1,7 +1,7 @@
 import pandas as pd
-import xmltodict
-import requests
+from cbr_rates import get_months, get_rates
 import sqlite3
+from currency_db import migrate_currency_table, get_stored_months, get_previous_rates, upsert_rates
 
 
 def get_currency_frequency(data_file):
@@ -17,39 +17,61 @@ def get_currency_frequency(data_file):
     return list(currency_dict.keys())
 
 
-def get_years_currency(file_name):
-    """Собирает курсы валют за диапазон между самой старой и новой вакансией с частотностью раз в месяц,
-     сохранет полученный результат (формат dataframe) в csv
+def get_missing_ranges(months, stored_months):
+    """Разбивает месяцы, курсов за которые нет в базе данных, на непрерывные диапазоны
+
+    Args:
+        months (list): Все месяцы в формате YYYY-MM по порядку
+        stored_months (set): Сохраненные месяцы
+    Returns:
+        list: Пары (первый месяц, последний месяц) диапазонов
+    """
+    ranges = []
+    for i, month in enumerate(months):
+        if month in stored_months:
+            continue
+        if ranges and months[i - 1] == ranges[-1][1]:
+            ranges[-1] = (ranges[-1][0], month)
+        else:
+            ranges.append((month, month))
+    return ranges
+
+
+def get_years_currency(file_name, db_name="currencies.db", incremental=True):
+    """Собирает курсы валют за диапазон между самой старой и новой вакансией с частотностью раз в месяц
+     (параллельно и с кэшем ответов центробанка на диске) и сохраняет их в таблицу rates(month, code, rate)
+     базы данных. Курсы из таблицы currency прежнего формата переносятся в rates, а сама таблица удаляется
+     (migrate_currency_table). В инкрементальном режиме запрашиваются только месяцы диапазона, которых нет
+     в базе, в том числе пропущенные из-за ошибок при прошлых запусках; месяцы, которые снова не удалось
+     получить, печатаются. Новые строки добавляются одной транзакцией
 
     Args:
         file_name (str): Путь к файлу vacancies_dif_currencies.csv
+        db_name (str): Путь к базе данных
+        incremental (bool): Дозагрузить только отсутствующие месяцы вместо повторного запроса всех месяцев
     """
-    data_file = pd.read_csv(file_name)
-    result = pd.DataFrame()
+    data_file = pd.read_csv(file_name, usecols=["salary_currency", "published_at"])
     currency_dict = get_currency_frequency(data_file)
     data_file = data_file[data_file["salary_currency"].isin(currency_dict)]
-    range_date = [data_file["published_at"].min().split("-")[:2], data_file["published_at"].max().split("-")[:2]]
-    row = {}
-    for year in range(int(range_date[0][0]), int(range_date[1][0]) + 1):
-        for month in range(int(range_date[0][1]), 13):
-            print(year, month)
-            try:
-                response = requests.get(r"http://www.cbr.ru/scripts/XML_daily.asp?date_req=01/{0}/{1}"
-                                        .format(str(month).zfill(2), year))
-            except Exception:
-                continue
-
-            response = xmltodict.parse(response.text)
-            for i in response['ValCurs']['Valute']:
-                if i['CharCode'] in currency_dict:
-                    row["date"] = "{0}-{1}".format(year, str(month).zfill(2))
-                    row[i['CharCode']] = round(float(i["Value"].replace(",", ".")) / int(i["Nominal"]), 7)
-            result = pd.concat([result, pd.DataFrame([row])])
-            if year == int(range_date[1][0]) and month == int(range_date[1][1]) or month == 12:
-                break
-
-    cnx = sqlite3.connect("currencies.db")
-    result.to_sql("currency", con=cnx, index=False)
-
-
-get_years_currency('data\\vacancies_dif_currencies.csv')
\ No newline at end of file
+    months = ["{0}-{1}".format(year, str(month).zfill(2)) for year, month in
+              get_months(data_file["published_at"].min()[:7], data_file["published_at"].max()[:7])]
+
+    cnx = sqlite3.connect(db_name, isolation_level=None)
+    with cnx:
+        cnx.execute("BEGIN")
+        migrate_currency_table(cnx)
+    missing_ranges = get_missing_ranges(months, get_stored_months(cnx) if incremental else set())
+    results = [get_rates(first_month, last_month, currency_dict, get_previous_rates(cnx, first_month) if incremental
+                         else {}) for first_month, last_month in missing_ranges]
+    with cnx:
+        cnx.execute("BEGIN")
+        for result in results:
+            upsert_rates(cnx, result)
+    missing_months = sorted(set(months) - get_stored_months(cnx))
+    cnx.close()
+    if missing_months:
+        print("Курсы не получены за месяцы: {0}. Они будут запрошены при следующем запуске"
+              .format(", ".join(missing_months)))
+
+
+get_years_currency('data\\vacancies_dif_currencies.csv')
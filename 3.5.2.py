@@ -1,56 +1,97 @@
+import os
+import tempfile
+import time
 import pandas as pd
-from math import isnan
-import sqlite3
+from currency_db import CurrencyRates, convert_salaries, convert_vacancies_file
+from vacancies_db import connect_for_load, close_after_load, create_vacancies_table, insert_vacancies, \
+    create_vacancies_indexes
+from vacancies_io import print_progress
+from worker_pool import get_executor
 
 
-def get_average_salary(row):
-    """Возращает значение для поля salary в зависимости от заполненности полей salary_from, salary_to
+def get_average_salary(data_file):
+    """Возращает значения для поля salary в зависимости от заполненности полей salary_from, salary_to
     Args:
-        row (Series): Строка в data_file
+        data_file (DataFrame): Данные из файла vacancies_dif_currencies.csv
     Returns:
-        float: Значение для ячейки 'salary'
+        Series: Значения для колонки 'salary' (NaN, если оба поля пустые)
     """
-    cell_values = []
-    cell_values += [row["salary_from"]] if not isnan(row["salary_from"]) else []
-    cell_values += [row["salary_to"]] if not isnan(row["salary_to"]) else []
-    if len(cell_values) != 0:
-        return sum(cell_values) / len(cell_values)
-    return
+    return data_file[["salary_from", "salary_to"]].mean(axis=1)
 
 
-def converting_salaries_into_rubles(row):
-    """Переводит значение salary в рубли после сравнения даты появления вакансии
-    с датой в файле currencies.db
+def converting_salaries_into_rubles(data_file, rates):
+    """Переводит значения salary в рубли, выбирая курсы из плотной таблицы по номеру месяца публикации и валюты
     Args:
-        row (Series): Строка в data_file
+        data_file (DataFrame): Данные с колонками salary, salary_currency, published_at
+        rates (CurrencyRates): Курсы валют из currencies.db
     Returns:
-        float: Значение для ячейки 'salary' в рублях
+        Series: Значения для колонки 'salary' в рублях
     """
-    answer = []
-    exchange = sqlite3.connect("currencies.db")
-    cur = exchange.cursor()
-    cur.execute("SELECT name FROM PRAGMA_TABLE_INFO('currency');")
-    for i in cur.fetchall():
-        answer.append(i[0])
-    if row["salary_currency"] in answer:
-        cur.execute(f"SELECT {row['salary_currency']} FROM currency WHERE Date = ?", (row["published_at"][:7],))
-        answer = row["salary"] * float(cur.fetchone()[0])
-        return round(answer, 2)
-    return row["salary"]
-
-
-def currency_conversion(file_name):
-    """Обрабатывает данные из колонок salary_from, salary_to, salary_currency и объединяет в колонку salary
+    rate = rates.get_rates(data_file["published_at"], data_file["salary_currency"])
+    is_converted = rates.get_codes(data_file["salary_currency"]) >= 0
+    return pd.Series(convert_salaries(data_file["salary"].to_numpy(), rate, is_converted), index=data_file.index)
+
+
+def currency_conversion(file_name, db_name="vacancies.db", chunksize=100000):
+    """Обрабатывает данные из колонок salary_from, salary_to, salary_currency и объединяет в колонку salary.
+    Файл читается частями по chunksize строк, каждая часть переводится в рубли и дописывается в таблицу
+    vacancies одной транзакцией, поэтому память не зависит от размера входного файла
     Args:
         file_name: Путь к файлу vacancies_dif_currencies.csv
+        db_name (str): Путь к базе данных вакансий
+        chunksize (int): Количество строк в одной части
+    """
+    rates = CurrencyRates.load()
+    cnx = connect_for_load(db_name)
+    with cnx:
+        cnx.execute("BEGIN")
+        create_vacancies_table(cnx)
+        converted, start_time = 0, time.perf_counter()
+        for chunk in pd.read_csv(file_name, chunksize=chunksize):
+            chunk["salary"] = get_average_salary(chunk)
+            chunk["salary"] = converting_salaries_into_rubles(chunk, rates)
+            insert_vacancies(cnx, chunk)
+            converted += len(chunk)
+            print_progress(converted, start_time)
+        create_vacancies_indexes(cnx)
+    close_after_load(cnx)
+
+
+def currency_conversion_by_years(directory="data\\csv_by_years_dif_currencies", db_name="vacancies.db"):
+    """Переводит зарплаты в рубли параллельно по файлам за годы (разделение из 3.3.1). Таблица курсов
+    сохраняется в файл и открывается процессами как отображение в память, каждый процесс записывает
+    результат своего года во временный файл, а результаты загружаются в таблицу vacancies по порядку годов
+    одной транзакцией
+    Args:
+        directory (str): Папка с csv-файлами вакансий за годы
+        db_name (str): Путь к базе данных вакансий
     """
-    data_file = pd.read_csv(file_name)
-    data_file["salary"] = data_file.apply(lambda row: get_average_salary(row), axis=1)
-    data_file["salary"] = data_file.apply(lambda row: converting_salaries_into_rubles(row), axis=1)
-    data_file.drop(labels=["salary_from", "salary_to", "salary_currency"], axis=1, inplace=True)
-    data_file = data_file[["name", "salary", "area_name", "published_at"]]
-    cnx = sqlite3.connect("vacancies.db")
-    data_file.to_sql("vacancies", con=cnx, index=False)
+    rates = CurrencyRates.load()
+    files = sorted(os.listdir(directory))
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        rates_file = os.path.join(temporary_dir, "rates.npy")
+        rates.save(rates_file)
+        outputs = get_executor().map(convert_vacancies_file, [os.path.join(directory, name) for name in files],
+                                     [os.path.join(temporary_dir, name + ".feather") for name in files],
+                                     [rates_file] * len(files), [rates.first_month] * len(files),
+                                     [rates.codes] * len(files))
+        cnx = connect_for_load(db_name)
+        with cnx:
+            cnx.execute("BEGIN")
+            create_vacancies_table(cnx)
+            converted, start_time = 0, time.perf_counter()
+            for output_name in outputs:
+                data_file = pd.read_feather(output_name)
+                insert_vacancies(cnx, data_file)
+                os.remove(output_name)
+                converted += len(data_file)
+                print_progress(converted, start_time)
+            create_vacancies_indexes(cnx)
+        close_after_load(cnx)
 
 
-currency_conversion('data\\vacancies_dif_currencies.csv')
\ No newline at end of file
+if __name__ == '__main__':
+    if input('Переводить параллельно по файлам за годы из 3.3.1? (да/нет): ') == 'да':
+        currency_conversion_by_years()
+    else:
+        currency_conversion('data\\vacancies_dif_currencies.csv')
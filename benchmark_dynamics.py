@@ -0,0 +1,77 @@
+import importlib.util
+import sys
+import time
+
+methods = {
+    "3.2.2.py": ["get_dynamics_by_year_not_with_multiprocessing", "get_dynamics_by_year_with_multiprocessing",
+                 "get_dynamics_by_year_in_memory", "get_dynamics_by_byte_ranges"],
+    "3.2.3.py": ["get_dynamics_by_year_not_with_multiprocessing", "get_dynamics_by_year_with_multiprocessing",
+                 "get_dynamics_by_year_with_concurrent_futures", "get_dynamics_by_year_in_memory",
+                 "get_dynamics_by_byte_ranges"]
+}
+
+
+def load_task(file_name):
+    """Загружает файл задания как модуль (имена файлов заданий начинаются с цифры и не импортируются напрямую).
+    Модуль регистрируется в sys.modules, чтобы его функции передавались в процессы пула
+
+    Args:
+        file_name (str): Название файла задания
+    Returns:
+        module: Модуль задания
+    """
+    spec = importlib.util.spec_from_file_location("task_" + file_name[:-3].replace(".", "_"), file_name)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+tasks = {file_name: load_task(file_name) for file_name in methods}
+
+
+def time_method(task, path_to_file, name_vacancy, method_name, number=3):
+    """Замеряет время метода подсчета динамик. Для каждого запуска создается новый объект Solution,
+    поэтому результаты предыдущих запусков не влияют на замер
+
+    Args:
+        task (module): Модуль задания с классом Solution
+        path_to_file (str): Путь к входному файлу
+        name_vacancy (str): Название выбранной профессии
+        method_name (str): Название метода Solution
+        number (int): Количество запусков
+    Returns:
+        float: Лучшее время запуска в секундах
+    """
+    times = []
+    for _ in range(number):
+        solve = task.Solution(path_to_file, name_vacancy)
+        start_time = time.perf_counter()
+        getattr(solve, method_name)()
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def run_benchmarks(path_to_file="data\\vacancies.csv", name_vacancy="Аналитик", db_name=None, number=3):
+    """Сравнивает время способов подсчета динамик из 3.2.2 и 3.2.3. Входной файл разделяется по годам
+    один раз до замеров, время разделения не учитывается
+
+    Args:
+        path_to_file (str): Путь к входному csv-файлу
+        name_vacancy (str): Название выбранной профессии
+        db_name (str): Путь к базе данных вакансий (vacancies.db из 3.5.2), None - без замера запросов к базе
+        number (int): Количество запусков каждого метода
+    """
+    for file_name, method_names in methods.items():
+        task = tasks[file_name]
+        task.Solution(path_to_file, name_vacancy).split_by_year()
+        for method_name in method_names:
+            print('{0} {1}: {2:.3f} с'.format(file_name, method_name,
+                                              time_method(task, path_to_file, name_vacancy, method_name, number)))
+        if db_name is not None:
+            print('{0} get_dynamics_from_db: {1:.3f} с'.format(
+                file_name, time_method(task, db_name, name_vacancy, "get_dynamics_from_db", number)))
+
+
+if __name__ == '__main__':
+    run_benchmarks(db_name=input("Введите путь к базе данных вакансий (пусто - без замера запросов к базе): ") or None)
@@ -0,0 +1,67 @@
+import timeit
+import pandas as pd
+from hh_harvester import get_vacancies_frame, vacancy_columns
+
+
+def get_sample_pages(file_name="hh_vacancies.csv"):
+    """Восстанавливает страницы ответов api.hh.ru по сто вакансий из выгруженного csv-файла
+
+    Args:
+        file_name (str): Путь к csv-файлу с вакансиями
+    Returns:
+        list: Страницы ответов api.hh.ru
+    """
+    data_file = pd.read_csv(file_name, dtype=object, keep_default_na=False)
+    items = [{'name': row.name, 'area': {'name': row.area_name}, 'published_at': row.published_at,
+              'salary': None if row.salary_currency == '' else
+              {'from': int(row.salary_from) if row.salary_from else None,
+               'to': int(row.salary_to) if row.salary_to else None, 'currency': row.salary_currency}}
+             for row in data_file.itertuples(index=False)]
+    return [{'items': items[i:i + 100]} for i in range(0, len(items), 100)]
+
+
+def get_vacancies_frame_by_loc(pages):
+    """Строит таблицу вакансий прежним способом - добавлением строк по одной через loc
+
+    Args:
+        pages (list): Страницы ответов api.hh.ru
+    Returns:
+        DataFrame: Вакансии
+    """
+    data_file = pd.DataFrame(columns=vacancy_columns)
+    for vacancies in pages:
+        for row in vacancies['items']:
+            if row['salary'] is not None:
+                data_file.loc[len(data_file)] = [row['name'], row['salary']['from'],
+                                                 row['salary']['to'], row['salary']['currency'],
+                                                 row['area']['name'], row['published_at']]
+            else:
+                data_file.loc[len(data_file)] = [row['name'], '',
+                                                 '', '',
+                                                 row['area']['name'], row['published_at']]
+    return data_file
+
+
+def compare_conversion(file_name="hh_vacancies.csv", number=3):
+    """Сравнивает время построения таблицы вакансий через loc и за один вызов конструктора DataFrame
+    на страницах того же размера, что и выгрузка в hh_vacancies.csv
+
+    Args:
+        file_name (str): Путь к csv-файлу с вакансиями
+        number (int): Количество повторов построения одним DataFrame (способ через loc выполняется один раз)
+
+    Prints:
+        Время каждого способа и ускорение
+    """
+    pages = get_sample_pages(file_name)
+    start = timeit.default_timer()
+    data_file = get_vacancies_frame_by_loc(pages)
+    by_loc = timeit.default_timer() - start
+    batched = min(timeit.repeat(lambda: get_vacancies_frame(pages), number=1, repeat=number))
+    assert get_vacancies_frame(pages).to_csv(index=False) == data_file.to_csv(index=False)
+    print("Вакансий: {0}, loc: {1:.3f} с, один DataFrame: {2:.4f} с, ускорение: {3:.0f}x"
+          .format(sum(len(page['items']) for page in pages), by_loc, batched, by_loc / batched))
+
+
+if __name__ == '__main__':
+    compare_conversion()
@@ -0,0 +1,144 @@
+import concurrent.futures as con_fut
+import datetime
+import os
+import pandas as pd
+import requests
+import xmltodict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CBR_URL = os.environ.get("CBR_URL", "http://www.cbr.ru/scripts/XML_daily.asp")
+RATES_CACHE_DIR = os.path.join("data", "cbr_cache")
+
+
+def get_months(first_month, last_month):
+    """Получает список месяцев между двумя месяцами включительно
+
+    Args:
+        first_month (str): Первый месяц в формате YYYY-MM
+        last_month (str): Последний месяц в формате YYYY-MM
+    Returns:
+        list: Пары (год, месяц)
+    """
+    year, month = int(first_month[:4]), int(first_month[5:7])
+    last_year, last_month = int(last_month[:4]), int(last_month[5:7])
+    months = []
+    while (year, month) <= (last_year, last_month):
+        months.append((year, month))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def get_session(pool_size, retries=3, backoff_factor=0.5):
+    """Создает сессию requests с пулом keep-alive соединений и повторными запросами
+    с экспоненциальной задержкой при ошибках соединения и ответах 429 и 5xx
+
+    Args:
+        pool_size (int): Размер пула соединений
+        retries (int): Количество повторных запросов
+        backoff_factor (float): Множитель задержки между повторными запросами
+    Returns:
+        Session: Сессия requests
+    """
+    retry = Retry(total=retries, backoff_factor=backoff_factor, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_month(session, year, month, base_url=CBR_URL, cache_dir=RATES_CACHE_DIR, timeout=10):
+    """Получает XML с курсами валют на первое число месяца. Ответы за прошедшие даты сохраняются
+    в кэш на диске (файл YYYY-MM.xml), поэтому повторно запрашиваются только отсутствующие месяцы
+
+    Args:
+        session (Session): Сессия requests
+        year (int): Год
+        month (int): Месяц
+        base_url (str): Адрес XML_daily.asp (или локального сервера с записанными ответами)
+        cache_dir (str): Папка с кэшем ответов
+        timeout (float): Таймаут запроса в секундах
+    Returns:
+        bytes: Содержимое XML, None - если после повторных запросов произошла сетевая ошибка
+        или в ответе нет курсов (месяц печатается и не сохраняется в кэш). Остальные ошибки,
+        например некорректный XML, не перехватываются
+    """
+    cache_path = os.path.join(cache_dir, "{0}-{1}.xml".format(year, str(month).zfill(2)))
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as file:
+            return file.read()
+
+    try:
+        response = session.get(base_url, params={"date_req": "01/{0}/{1}".format(str(month).zfill(2), year)},
+                               timeout=timeout)
+        response.raise_for_status()
+    except requests.RequestException as error:
+        print("Курсы за {0}-{1} не получены: {2}".format(year, str(month).zfill(2), error))
+        return None
+    content = response.content
+    if "ValCurs" not in xmltodict.parse(content):
+        print("Курсы за {0}-{1} не получены: в ответе нет ValCurs".format(year, str(month).zfill(2)))
+        return None
+
+    if datetime.date(year, month, 1) <= datetime.date.today():
+        os.makedirs(cache_dir, exist_ok=True)
+        temporary_path = "{0}.{1}.tmp".format(cache_path, os.getpid())
+        with open(temporary_path, "wb") as file:
+            file.write(content)
+        os.replace(temporary_path, cache_path)
+    return content
+
+
+def get_month_rates(content, currencies):
+    """Получает курсы выбранных валют из XML центробанка
+
+    Args:
+        content (bytes): Содержимое XML
+        currencies (list): Коды валют
+    Returns:
+        dict: Курс в рублях за единицу валюты для каждого кода
+    """
+    valutes = xmltodict.parse(content)["ValCurs"].get("Valute") or []
+    if isinstance(valutes, dict):
+        valutes = [valutes]
+    return dict([(valute["CharCode"], round(float(valute["Value"].replace(",", ".")) / int(valute["Nominal"]), 7))
+                 for valute in valutes if valute["CharCode"] in currencies])
+
+
+def get_rates(first_month, last_month, currencies, previous_rates=None, base_url=CBR_URL, cache_dir=RATES_CACHE_DIR,
+              workers=8, retries=3, backoff_factor=0.5, timeout=10):
+    """Собирает курсы валют на первое число каждого месяца. Месяцы запрашиваются параллельно
+    в пуле потоков с общей сессией, таблица строится один раз из списка строк.
+    Если валюта отсутствует в каком-то месяце, берется ее последний известный курс,
+    месяцы, которые получить не удалось, печатаются и отсутствуют в результате
+
+    Args:
+        first_month (str): Первый месяц в формате YYYY-MM
+        last_month (str): Последний месяц в формате YYYY-MM
+        currencies (list): Коды валют
+        previous_rates (dict): Последние известные курсы валют до первого месяца (при дозагрузке новых месяцев)
+        base_url (str): Адрес XML_daily.asp (или локального сервера с записанными ответами)
+        cache_dir (str): Папка с кэшем ответов
+        workers (int): Максимальное количество одновременных запросов
+        retries (int): Количество повторных запросов
+        backoff_factor (float): Множитель задержки между повторными запросами
+        timeout (float): Таймаут запроса в секундах
+    Returns:
+        DataFrame: Курсы валют по месяцам (колонка date в формате YYYY-MM и колонка для каждой валюты)
+    """
+    months = get_months(first_month, last_month)
+    with get_session(workers, retries, backoff_factor) as session, \
+            con_fut.ThreadPoolExecutor(max_workers=workers) as executor:
+        contents = list(executor.map(lambda date: fetch_month(session, date[0], date[1], base_url, cache_dir, timeout),
+                                     months))
+
+    rows, row = [], dict(previous_rates or {})
+    for (year, month), content in zip(months, contents):
+        if content is None:
+            continue
+        row["date"] = "{0}-{1}".format(year, str(month).zfill(2))
+        row.update(get_month_rates(content, currencies))
+        rows.append(dict(row))
+    return pd.DataFrame(rows)
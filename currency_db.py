@@ -0,0 +1,264 @@
+import os
+import sqlite3
+import numpy as np
+import pandas as pd
+from urllib.request import pathname2url
+
+
+def connect_read_only(db_name):
+    """Открывает базу данных только для чтения, поэтому чтение курсов не изменяет файл базы
+
+    Args:
+        db_name (str): Путь к базе данных
+    Returns:
+        Connection: Соединение с базой данных
+    """
+    return sqlite3.connect("file:{0}?mode=ro".format(pathname2url(os.path.abspath(db_name))), uri=True)
+
+
+def get_tables(cnx):
+    """Получает названия таблиц базы данных
+
+    Args:
+        cnx (Connection): Соединение с базой данных
+    Returns:
+        set: Названия таблиц
+    """
+    return set(row[0] for row in cnx.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall())
+
+
+def create_rates_table(cnx):
+    """Создает таблицу курсов rates(month, code, rate) с составным первичным ключом (month, code), если ее нет
+
+    Args:
+        cnx (Connection): Соединение с базой данных
+    """
+    cnx.execute('CREATE TABLE IF NOT EXISTS "rates" ("month" TEXT NOT NULL, "code" TEXT NOT NULL, '
+                '"rate" REAL NOT NULL, PRIMARY KEY ("month", "code")) WITHOUT ROWID')
+
+
+def migrate_currency_table(cnx):
+    """Создает таблицу rates и переносит в нее курсы из широкой таблицы currency (колонка date и колонка
+    для каждой валюты), если она есть. Уже сохраненные в rates курсы не заменяются. Таблица currency
+    после переноса удаляется, чтобы курсы хранились в одной таблице
+
+    Args:
+        cnx (Connection): Соединение с базой данных
+    """
+    create_rates_table(cnx)
+    if "currency" not in get_tables(cnx):
+        return
+    for column in cnx.execute('PRAGMA table_info("currency")').fetchall():
+        if column[1] != "date":
+            cnx.execute('INSERT OR IGNORE INTO "rates" ("month", "code", "rate") '
+                        'SELECT "date", ?, "{0}" FROM "currency" WHERE "{0}" IS NOT NULL'.format(column[1]),
+                        (column[1],))
+    cnx.execute('DROP TABLE "currency"')
+
+
+def get_stored_months(cnx):
+    """Получает месяцы, за которые в таблице rates есть курсы
+
+    Args:
+        cnx (Connection): Соединение с базой данных
+    Returns:
+        set: Месяцы в формате YYYY-MM
+    """
+    return set(row[0] for row in cnx.execute('SELECT DISTINCT "month" FROM "rates"').fetchall())
+
+
+def get_previous_rates(cnx, month):
+    """Получает последние известные курсы валют до заданного месяца
+
+    Args:
+        cnx (Connection): Соединение с базой данных
+        month (str): Месяц в формате YYYY-MM
+    Returns:
+        dict: Курс для каждого кода валюты
+    """
+    rows = cnx.execute('SELECT "code", "rate" FROM "rates" AS r WHERE "month" = '
+                       '(SELECT MAX("month") FROM "rates" WHERE "code" = r."code" AND "month" < ?)',
+                       (month,)).fetchall()
+    return dict(rows)
+
+
+def upsert_rates(cnx, result):
+    """Добавляет или обновляет курсы валют
+
+    Args:
+        cnx (Connection): Соединение с базой данных
+        result (DataFrame): Курсы валют по месяцам (колонка date и колонка для каждой валюты), может быть пустым
+    """
+    if result.empty:
+        return
+    rates = result.melt(id_vars="date", var_name="code", value_name="rate").dropna(subset=["rate"])
+    cnx.executemany('INSERT INTO "rates" ("month", "code", "rate") VALUES (?, ?, ?) '
+                    'ON CONFLICT("month", "code") DO UPDATE SET "rate" = excluded."rate"',
+                    rates.itertuples(index=False, name=None))
+
+
+def convert_salaries(salary, rate, is_converted):
+    """Переводит зарплаты в рубли с округлением до копеек встроенной функцией round для каждого значения,
+    как при построчном переводе (векторное округление numpy в редких случаях отличается на копейку)
+
+    Args:
+        salary (ndarray): Зарплаты в валюте вакансии
+        rate (ndarray): Курсы валют вакансий
+        is_converted (ndarray): Маска вакансий, зарплата которых переводится (остальные не изменяются)
+    Returns:
+        ndarray: Зарплаты в рублях
+    """
+    result = np.array(salary, dtype=np.float64)
+    result[is_converted] = [round(value, 2) for value in (result[is_converted] * rate[is_converted]).tolist()]
+    return result
+
+
+def get_month_numbers(months):
+    """Переводит месяцы в номера (год * 12 + месяц - 1)
+
+    Args:
+        months (Series): Даты, начинающиеся с YYYY-MM
+    Returns:
+        ndarray: Номера месяцев
+    """
+    months = months.astype(str)
+    return months.str[:4].astype(np.int64).to_numpy() * 12 + months.str[5:7].astype(np.int64).to_numpy() - 1
+
+
+class CurrencyRates:
+    """Класс плотной таблицы курсов валют в памяти: строка - смещение месяца от первого месяца,
+    колонка - номер валюты. Курсы для массива вакансий находятся одной векторной выборкой
+
+    Attributes:
+        first_month (int): Номер первого месяца таблицы (год * 12 + месяц - 1)
+        codes (list): Коды валют в порядке колонок
+        table (ndarray): Курсы валют (NaN, если курса за месяц нет)
+    """
+    def __init__(self, first_month, codes, table):
+        """Инициализирует объект CurrencyRates.
+
+        Args:
+            first_month (int): Номер первого месяца таблицы
+            codes (list): Коды валют в порядке колонок
+            table (ndarray): Курсы валют
+        """
+        self.first_month, self.codes, self.table = first_month, codes, table
+
+    @classmethod
+    def from_long(cls, rates):
+        """Строит таблицу по курсам в длинном формате
+
+        Args:
+            rates (DataFrame): Колонки month, code, rate
+        Returns:
+            CurrencyRates: Таблица курсов
+        """
+        codes = sorted(rates["code"].unique().tolist())
+        if len(rates) == 0:
+            return cls(0, codes, np.empty((0, 0)))
+        months = get_month_numbers(rates["month"])
+        first_month = int(months.min())
+        table = np.full((int(months.max()) - first_month + 1, len(codes)), np.nan)
+        table[months - first_month, pd.Categorical(rates["code"], categories=codes).codes] = rates["rate"].to_numpy()
+        return cls(first_month, codes, table)
+
+    @classmethod
+    def from_frame(cls, convert):
+        """Строит таблицу по курсам в широком формате (как в currency.csv)
+
+        Args:
+            convert (DataFrame): Колонка date и колонка для каждой валюты
+        Returns:
+            CurrencyRates: Таблица курсов
+        """
+        rates = convert.melt(id_vars="date", var_name="code", value_name="rate").dropna(subset=["rate"])
+        return cls.from_long(rates.rename(columns={"date": "month"}))
+
+    @classmethod
+    def load(cls, db_name="currencies.db"):
+        """Считывает курсы из базы данных, открытой только для чтения: из таблицы rates,
+        а если база еще не перенесена на нее (migrate_currency_table в 3.5.1) - из широкой таблицы currency
+
+        Args:
+            db_name (str): Путь к базе данных с курсами валют
+        Returns:
+            CurrencyRates: Таблица курсов
+        """
+        cnx = connect_read_only(db_name)
+        if "rates" in get_tables(cnx):
+            result = cls.from_long(pd.read_sql('SELECT "month", "code", "rate" FROM "rates"', cnx))
+        else:
+            result = cls.from_frame(pd.read_sql('SELECT * FROM "currency"', cnx))
+        cnx.close()
+        return result
+
+    @classmethod
+    def open(cls, file_name, first_month, codes):
+        """Открывает таблицу курсов, сохраненную методом save, как отображение файла в память (только чтение),
+        чтобы процессы-обработчики использовали одну копию таблицы вместо ее пересылки каждому процессу
+
+        Args:
+            file_name (str): Путь к файлу .npy
+            first_month (int): Номер первого месяца таблицы
+            codes (list): Коды валют в порядке колонок
+        Returns:
+            CurrencyRates: Таблица курсов
+        """
+        return cls(first_month, codes, np.load(file_name, mmap_mode="r"))
+
+    def save(self, file_name):
+        """Сохраняет массив курсов в файл .npy
+
+        Args:
+            file_name (str): Путь к файлу .npy
+        """
+        np.save(file_name, self.table)
+
+    def get_codes(self, currencies):
+        """Переводит коды валют в номера колонок таблицы
+
+        Args:
+            currencies (Series): Коды валют
+        Returns:
+            ndarray: Номера колонок (-1 для валют, которых нет в таблице)
+        """
+        return pd.Categorical(currencies, categories=self.codes).codes.astype(np.int64)
+
+    def get_rates(self, months, currencies):
+        """Находит курсы для массива вакансий
+
+        Args:
+            months (Series): Даты публикации вакансий, начинающиеся с YYYY-MM
+            currencies (Series): Валюты вакансий
+        Returns:
+            ndarray: Курсы (NaN, если валюты или месяца нет в таблице)
+        """
+        offsets = get_month_numbers(months) - self.first_month
+        codes = self.get_codes(currencies)
+        found = (offsets >= 0) & (offsets < self.table.shape[0]) & (codes >= 0)
+        rates = np.full(len(offsets), np.nan)
+        rates[found] = self.table[offsets[found], codes[found]]
+        return rates
+
+
+def convert_vacancies_file(file_name, output_name, rates_file, first_month, codes):
+    """Переводит зарплаты вакансий одного файла (например, файла за год) в рубли и сохраняет результат
+    в формате Feather. Выполняется в процессе-обработчике, таблица курсов открывается из файла в память
+
+    Args:
+        file_name (str): Путь к csv-файлу с вакансиями
+        output_name (str): Путь к выходному файлу Feather
+        rates_file (str): Путь к массиву курсов, сохраненному CurrencyRates.save
+        first_month (int): Номер первого месяца таблицы курсов
+        codes (list): Коды валют в порядке колонок таблицы курсов
+    Returns:
+        str: Путь к выходному файлу
+    """
+    rates = CurrencyRates.open(rates_file, first_month, codes)
+    data_file = pd.read_csv(file_name)
+    salary = data_file[["salary_from", "salary_to"]].mean(axis=1).to_numpy()
+    rate = rates.get_rates(data_file["published_at"], data_file["salary_currency"])
+    is_converted = rates.get_codes(data_file["salary_currency"]) >= 0
+    data_file["salary"] = convert_salaries(salary, rate, is_converted)
+    data_file[["name", "salary", "area_name", "published_at"]].to_feather(output_name)
+    return output_name
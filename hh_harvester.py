@@ -0,0 +1,285 @@
+import concurrent.futures as con_fut
+import csv
+import datetime
+import json
+import os
+import threading
+import time
+import pandas as pd
+from cbr_rates import get_session
+
+HH_URL = os.environ.get("HH_URL", "https://api.hh.ru/vacancies")
+HH_TIMEZONE = datetime.timezone(datetime.timedelta(hours=3))
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+MAX_FOUND = 2000
+
+vacancy_columns = ['name', 'salary_from', 'salary_to', 'salary_currency', 'area_name', 'published_at']
+
+
+class RateLimiter:
+    """Класс ограничения частоты запросов, общий для всех потоков: запросы разносятся по времени
+    так, чтобы их было не больше заданного количества в секунду
+
+    Attributes:
+        interval (float): Минимальный интервал между запросами в секундах
+        next_time (float): Время, раньше которого нельзя отправить следующий запрос
+        lock (Lock): Блокировка для изменения next_time
+    """
+    def __init__(self, requests_per_second):
+        """Инициализирует объект RateLimiter.
+
+        Args:
+            requests_per_second (float): Максимальное количество запросов в секунду
+        """
+        self.interval = 1 / requests_per_second
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Ждет, пока можно будет отправить очередной запрос
+        """
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_time)
+            self.next_time = start + self.interval
+        time.sleep(max(0.0, start - now))
+
+
+def get_windows(day, windows_count=24):
+    """Делит сутки на равные временные окна
+
+    Args:
+        day (str): День в формате YYYY-MM-DD
+        windows_count (int): Количество окон
+    Returns:
+        list: Пары (начало, конец окна) в формате api.hh.ru, конец окна на секунду раньше начала следующего
+    """
+    start = datetime.datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=HH_TIMEZONE)
+    bounds = [start + datetime.timedelta(days=1) * i / windows_count for i in range(windows_count + 1)]
+    return [(bounds[i].strftime(DATE_FORMAT), (bounds[i + 1] - datetime.timedelta(seconds=1)).strftime(DATE_FORMAT))
+            for i in range(windows_count)]
+
+
+def get_range_windows(first_day, last_day, windows_count=24):
+    """Делит диапазон дней на временные окна
+
+    Args:
+        first_day (str): Первый день в формате YYYY-MM-DD
+        last_day (str): Последний день в формате YYYY-MM-DD (включительно)
+        windows_count (int): Количество окон в сутках
+    Returns:
+        list: Пары (начало, конец окна) в формате api.hh.ru
+    """
+    day, last_day = datetime.date.fromisoformat(first_day), datetime.date.fromisoformat(last_day)
+    windows = []
+    while day <= last_day:
+        windows += get_windows(day.isoformat(), windows_count)
+        day += datetime.timedelta(days=1)
+    return windows
+
+
+def split_window(window):
+    """Делит временное окно пополам с точностью до секунды
+
+    Args:
+        window (tuple): Начало и конец временного окна
+    Returns:
+        list: Две половины окна, пустой список - если окно состоит из одной секунды
+    """
+    start, end = [datetime.datetime.strptime(date, DATE_FORMAT) for date in window]
+    if end - start < datetime.timedelta(seconds=1):
+        return []
+    middle = start + datetime.timedelta(seconds=(end - start) // datetime.timedelta(seconds=1) // 2)
+    return [(window[0], middle.strftime(DATE_FORMAT)),
+            ((middle + datetime.timedelta(seconds=1)).strftime(DATE_FORMAT), window[1])]
+
+
+def get_page(session, limiter, date_from, date_to, page, base_url=HH_URL, timeout=10):
+    """Получает ответ на запрос с api.hh.ru по сто вакансий за страницу
+
+    Args:
+        session (Session): Сессия requests с повторными запросами
+        limiter (RateLimiter): Ограничение частоты запросов
+        date_from (str): Начало временного окна
+        date_to (str): Конец временного окна
+        page (int): Номер страницы для выгрузки
+        base_url (str): Адрес api.hh.ru/vacancies (или локального сервера для проверки)
+        timeout (float): Таймаут запроса в секундах
+    Returns:
+        dict: Страница IT-вакансий
+    """
+    params = {
+        "specialization": 1,
+        "found": 1,
+        "per_page": 100,
+        "page": page,
+        "date_from": date_from,
+        "date_to": date_to
+    }
+    limiter.wait()
+    response = session.get(base_url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def get_vacancy_row(item):
+    """Переводит вакансию из ответа api.hh.ru в строку csv-файла
+
+    Args:
+        item (dict): Вакансия
+    Returns:
+        list: Значения колонок name, salary_from, salary_to, salary_currency, area_name, published_at
+    """
+    salary = item['salary']
+    if salary is not None:
+        return [item['name'], salary['from'], salary['to'], salary['currency'], item['area']['name'],
+                item['published_at']]
+    return [item['name'], '', '', '', item['area']['name'], item['published_at']]
+
+
+def get_vacancies_frame(pages):
+    """Строит таблицу вакансий из страниц ответов api.hh.ru: вакансии переводятся в список строк,
+    и DataFrame создается один раз (вместо добавления строк по одной через loc)
+
+    Args:
+        pages (list): Страницы ответов api.hh.ru
+    Returns:
+        DataFrame: Вакансии с колонками name, salary_from, salary_to, salary_currency, area_name, published_at
+    """
+    return pd.DataFrame([get_vacancy_row(item) for js_obj in pages for item in js_obj['items']],
+                        columns=vacancy_columns, dtype=object)
+
+
+def split_windows(session, limiter, executor, windows, base_url=HH_URL, max_found=MAX_FOUND):
+    """Делит временные окна пополам, пока в каждом окне не станет не больше max_found вакансий
+    (api.hh.ru отдает не больше 2000 вакансий на запрос, остальные молча отбрасываются).
+    Первые страницы окон каждого уровня деления запрашиваются параллельно
+
+    Args:
+        session (Session): Сессия requests
+        limiter (RateLimiter): Ограничение частоты запросов
+        executor (ThreadPoolExecutor): Пул потоков
+        windows (list): Исходные временные окна
+        base_url (str): Адрес api.hh.ru/vacancies
+        max_found (int): Максимальное количество вакансий в окне
+    Returns:
+        list, dict: Итоговые окна в порядке времени, первые страницы этих окон
+    """
+    result, first_pages = [], {}
+    while windows:
+        pages = executor.map(lambda window: get_page(session, limiter, window[0], window[1], 0, base_url), windows)
+        next_windows = []
+        for window, js_obj in zip(windows, pages):
+            halves = split_window(window) if js_obj['found'] > max_found else []
+            if halves:
+                next_windows += halves
+            else:
+                result.append(window)
+                first_pages[window] = js_obj
+        windows = next_windows
+    result.sort(key=lambda window: datetime.datetime.strptime(window[0], DATE_FORMAT))
+    return result, first_pages
+
+
+def get_window_rows(session, limiter, window, base_url=HH_URL, first_page=None):
+    """Получает все страницы вакансий временного окна
+
+    Args:
+        session (Session): Сессия requests
+        limiter (RateLimiter): Ограничение частоты запросов
+        window (tuple): Начало и конец временного окна
+        base_url (str): Адрес api.hh.ru/vacancies
+        first_page (dict): Уже полученная первая страница окна
+    Returns:
+        list: Строки csv-файла
+    """
+    rows, page, pages = [], 0, 1
+    while page < pages:
+        js_obj = first_page if page == 0 and first_page is not None else \
+            get_page(session, limiter, window[0], window[1], page, base_url)
+        rows += [get_vacancy_row(item) for item in js_obj['items']]
+        pages = js_obj['pages']
+        page += 1
+    return rows
+
+
+def read_checkpoint(checkpoint_name):
+    """Считывает контрольную точку выгрузки
+
+    Args:
+        checkpoint_name (str): Путь к файлу контрольной точки
+    Returns:
+        dict: Запрошенные окна до деления (request), все окна выгрузки (windows), выгруженные окна (done)
+        и размер выходного файла после них (size), None - если точки нет
+    """
+    if not os.path.exists(checkpoint_name):
+        return None
+    with open(checkpoint_name, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def write_checkpoint(checkpoint_name, request, windows, done, size):
+    """Атомарно записывает контрольную точку выгрузки
+
+    Args:
+        checkpoint_name (str): Путь к файлу контрольной точки
+        request (list): Запрошенные окна до деления
+        windows (list): Все окна выгрузки после деления
+        done (set): Выгруженные окна в формате "начало/конец"
+        size (int): Размер выходного файла после записи выгруженных окон
+    """
+    temporary_name = "{0}.{1}.tmp".format(checkpoint_name, os.getpid())
+    with open(temporary_name, "w", encoding="utf-8") as file:
+        json.dump({"request": request, "windows": windows, "done": sorted(done), "size": size}, file)
+    os.replace(temporary_name, checkpoint_name)
+
+
+def harvest_vacancies(output_name, windows, base_url=HH_URL, workers=4, requests_per_second=4.0,
+                      checkpoint_name=None, max_found=MAX_FOUND):
+    """Выгружает вакансии с api.hh.ru по временным окнам и записывает их в csv-файл.
+    Окна, в которых больше max_found вакансий, сначала делятся пополам, пока не уложатся в ограничение api.
+    Окна выгружаются параллельно в пуле потоков с общей сессией и ограничением частоты запросов,
+    строки каждого окна сразу дописываются в файл в порядке окон. После каждого окна сохраняется
+    контрольная точка, поэтому после сбоя повторный запуск с теми же окнами продолжит выгрузку с невыгруженных
+    окон. Контрольная точка другого запроса (например, за другой диапазон дней) отбрасывается, и выгрузка
+    начинается заново
+
+    Args:
+        output_name (str): Путь к выходному csv-файлу
+        windows (list): Временные окна (пары начало, конец)
+        base_url (str): Адрес api.hh.ru/vacancies (или локального сервера для проверки)
+        workers (int): Количество окон, выгружаемых одновременно
+        requests_per_second (float): Максимальное количество запросов в секунду
+        checkpoint_name (str): Путь к файлу контрольной точки, по умолчанию - рядом с выходным файлом
+        max_found (int): Максимальное количество вакансий в окне
+    """
+    checkpoint_name = checkpoint_name or output_name + ".checkpoint"
+    request = [list(window) for window in windows]
+    checkpoint = read_checkpoint(checkpoint_name)
+    if checkpoint is not None and checkpoint.get("request") == request and os.path.exists(output_name):
+        done, windows = set(checkpoint["done"]), [tuple(window) for window in checkpoint["windows"]]
+        with open(output_name, "r+b") as file:
+            file.truncate(checkpoint["size"])
+    else:
+        done = None
+
+    limiter, first_pages = RateLimiter(requests_per_second), {}
+    with open(output_name, "w" if done is None else "a", encoding="utf-8", newline="") as file, \
+            get_session(workers) as session, con_fut.ThreadPoolExecutor(max_workers=workers) as executor:
+        writer = csv.writer(file, lineterminator="\n")
+        if done is None:
+            done = set()
+            windows, first_pages = split_windows(session, limiter, executor, windows, base_url, max_found)
+            writer.writerow(vacancy_columns)
+            file.flush()
+            write_checkpoint(checkpoint_name, request, windows, done, os.fstat(file.fileno()).st_size)
+
+        pending = [window for window in windows if "/".join(window) not in done]
+        for window, rows in zip(pending, executor.map(lambda window: get_window_rows(
+                session, limiter, window, base_url, first_pages.pop(window, None)), pending)):
+            writer.writerows(rows)
+            file.flush()
+            done.add("/".join(window))
+            write_checkpoint(checkpoint_name, request, windows, done, os.fstat(file.fileno()).st_size)
+
+    os.remove(checkpoint_name)
@@ -0,0 +1,57 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """Класс автомата Ахо-Корасик для поиска сразу нескольких подстрок за один проход по строке.
+
+    Attributes:
+        patterns (list): Искомые подстроки
+        transitions (list): Переходы автомата для каждого состояния
+        fails (list): Суффиксные ссылки для каждого состояния
+        outputs (list): Номера подстрок, которые заканчиваются в каждом состоянии
+    """
+    def __init__(self, patterns):
+        """Инициализирует объект AhoCorasick и строит автомат по подстрокам.
+
+        Args:
+            patterns (list): Искомые подстроки
+        """
+        self.patterns = list(patterns)
+        self.transitions, self.fails, self.outputs = [{}], [0], [set()]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for symbol in pattern:
+                if symbol not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.fails.append(0)
+                    self.outputs.append(set())
+                    self.transitions[state][symbol] = len(self.transitions) - 1
+                state = self.transitions[state][symbol]
+            self.outputs[state].add(index)
+
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for symbol, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fail = self.fails[state]
+                while fail and symbol not in self.transitions[fail]:
+                    fail = self.fails[fail]
+                self.fails[next_state] = self.transitions[fail].get(symbol, 0)
+                self.outputs[next_state] |= self.outputs[self.fails[next_state]]
+
+    def find(self, text):
+        """Находит все подстроки, которые встречаются в строке
+
+        Args:
+            text (str): Строка для поиска
+        Returns:
+            set: Номера найденных подстрок
+        """
+        found, state = set(), 0
+        for symbol in text:
+            while state and symbol not in self.transitions[state]:
+                state = self.fails[state]
+            state = self.transitions[state].get(symbol, 0)
+            found |= self.outputs[state]
+        return found
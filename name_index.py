@@ -0,0 +1,152 @@
+import csv
+import os
+import pickle
+import numpy as np
+from array import array
+from vacancies_io import CACHE_DIR, get_cache_path, save_to_cache
+
+indexes = {}
+
+
+def get_trigrams(text):
+    """Разбивает строку на триграммы (подстроки из трех символов)
+
+    Args:
+        text (str): Строка
+    Returns:
+        set: Триграммы строки
+    """
+    return set(text[i:i + 3] for i in range(len(text) - 2))
+
+
+class NameIndex:
+    """Класс триграммного инвертированного индекса по названиям вакансий.
+
+    Индекс строится один раз по колонке name: для каждой триграммы названия в нижнем регистре хранится
+    список номеров уникальных названий, а для каждого уникального названия - номера строк данных с ним
+    (строки считаются без заголовка и пустых строк, как их нумерует pandas.read_csv).
+    Запрос по подстроке пересекает списки триграмм, проверяет только найденных кандидатов
+    и возвращает номера строк, не просматривая остальные вакансии
+
+    Attributes:
+        names (list): Уникальные названия вакансий
+        trigrams (dict): Номера уникальных названий (массивы numpy) для каждой триграммы
+        offsets (ndarray): Границы строк каждого уникального названия в массиве rows
+        rows (ndarray): Номера строк, сгруппированные по уникальным названиям
+        rows_count (int): Количество строк данных в файле
+    """
+    def __init__(self, names, trigrams, offsets, rows, rows_count):
+        """Инициализирует объект NameIndex.
+
+        Args:
+            names (list): Уникальные названия вакансий
+            trigrams (dict): Номера уникальных названий для каждой триграммы
+            offsets (ndarray): Границы строк каждого уникального названия в массиве rows
+            rows (ndarray): Номера строк, сгруппированные по уникальным названиям
+            rows_count (int): Количество строк данных в файле
+        """
+        self.names, self.trigrams = names, trigrams
+        self.offsets, self.rows, self.rows_count = offsets, rows, rows_count
+
+    @classmethod
+    def build(cls, path_to_file):
+        """Строит индекс за один проход по колонке name csv-файла
+
+        Args:
+            path_to_file (str): Путь к входному csv-файлу
+        Returns:
+            NameIndex: Индекс по названиям вакансий
+        """
+        name_ids, codes = {}, array("I")
+        with open(path_to_file, mode='r', encoding='utf-8-sig', newline='') as file:
+            reader = csv.reader(file)
+            name_column = next(reader).index("name")
+            for row in reader:
+                if row:
+                    name = row[name_column] if len(row) > name_column else ''
+                    codes.append(name_ids.setdefault(name, len(name_ids)))
+
+        names = list(name_ids)
+        trigrams = {}
+        for name_id, name in enumerate(names):
+            for trigram in get_trigrams(name.lower()):
+                trigrams.setdefault(trigram, []).append(name_id)
+        trigrams = dict((trigram, np.array(ids, dtype=np.uint32)) for trigram, ids in trigrams.items())
+
+        codes = np.frombuffer(codes, dtype=np.uint32)
+        rows = np.argsort(codes, kind="stable").astype(np.uint32)
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=len(names))))).astype(np.int64)
+        return cls(names, trigrams, offsets, rows, len(codes))
+
+    def find_name_ids(self, substring, case=True):
+        """Находит уникальные названия, содержащие подстроку
+
+        Args:
+            substring (str): Искомая подстрока
+            case (bool): Учитывать регистр
+        Returns:
+            list: Номера уникальных названий
+        """
+        lower = substring.lower()
+        candidates = None
+        for trigram in sorted(get_trigrams(lower), key=lambda t: len(self.trigrams.get(t, ()))):
+            if trigram not in self.trigrams:
+                return []
+            ids = self.trigrams[trigram]
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+            if len(candidates) == 0:
+                return []
+        if candidates is None:
+            candidates = range(len(self.names))
+
+        if case:
+            return [name_id for name_id in candidates if substring in self.names[name_id]]
+        return [name_id for name_id in candidates if lower in self.names[name_id].lower()]
+
+    def find_rows(self, substring, case=True):
+        """Находит номера строк вакансий, название которых содержит подстроку
+
+        Args:
+            substring (str): Искомая подстрока
+            case (bool): Учитывать регистр
+        Returns:
+            ndarray: Номера строк данных по возрастанию
+        """
+        name_ids = self.find_name_ids(substring, case)
+        if not name_ids:
+            return np.array([], dtype=np.int64)
+        rows = np.concatenate([self.rows[self.offsets[name_id]:self.offsets[name_id + 1]] for name_id in name_ids])
+        rows.sort()
+        return rows.astype(np.int64)
+
+
+def get_name_index(path_to_file, cache_dir=CACHE_DIR):
+    """Возвращает индекс по названиям вакансий csv-файла. Индекс строится при первом запросе
+    и сохраняется на диск рядом с колоночным кэшем, при повторных запросах читается с диска
+    (и хранится в памяти процесса). Если csv-файл изменился, индекс пересоздается, поэтому индекс
+    используется только для неизменных входных файлов, а не для файлов по годам, пересоздаваемых при каждом запуске
+
+    Args:
+        path_to_file (str): Путь к входному csv-файлу
+        cache_dir (str): Папка с кэшем
+    Returns:
+        NameIndex: Индекс по названиям вакансий
+    """
+    index_path, prefix = get_cache_path(path_to_file, cache_dir, "index")
+    if index_path in indexes:
+        return indexes[index_path]
+
+    if os.path.exists(index_path):
+        with open(index_path, "rb") as file:
+            name_index = NameIndex(*pickle.load(file))
+    else:
+        name_index = NameIndex.build(path_to_file)
+
+        def save(path):
+            with open(path, "wb") as file:
+                pickle.dump((name_index.names, name_index.trigrams, name_index.offsets,
+                             name_index.rows, name_index.rows_count), file, protocol=pickle.HIGHEST_PROTOCOL)
+        save_to_cache(index_path, prefix, save)
+
+    indexes[index_path] = name_index
+    return name_index
@@ -0,0 +1,178 @@
+import hashlib
+import io
+import json
+import os
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.image import imsave
+from vacancies_io import save_to_cache
+from worker_pool import get_executor
+
+CHARTS_DIR = os.path.join("data", "cache", "charts")
+PANEL_SIZE = (3.2, 2.4)
+DPI = 300
+
+
+def get_chart_key(name_vacancy, dynamics, style):
+    """Считает хэш содержимого диаграмм: названия профессии, всех динамик и параметров оформления
+
+    Args:
+        name_vacancy (str): Название выбранной профессии
+        dynamics (list): Динамики dynamics1 - dynamics6
+        style (dict): Размеры шрифтов
+    Returns:
+        str: Хэш sha256
+    """
+    content = json.dumps([name_vacancy, [list(dynamic.items()) for dynamic in dynamics], style],
+                         ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def get_chart_prefix(name_vacancy, style):
+    """Считает префикс всех версий картинки отчета: названия профессии и параметров оформления
+
+    Args:
+        name_vacancy (str): Название выбранной профессии
+        style (dict): Размеры шрифтов
+    Returns:
+        str: Хэш md5
+    """
+    content = json.dumps([name_vacancy, style], ensure_ascii=False)
+    return hashlib.md5(content.encode("utf-8")).hexdigest()
+
+
+def draw_years(ax, dynamic, dynamic_vacancy, label, label_vacancy, title, style):
+    """Рисует диаграмму динамики по годам: общей и для выбранной профессии
+
+    Args:
+        ax (Axes): Область диаграммы
+        dynamic (dict): Общая динамика по годам
+        dynamic_vacancy (dict): Динамика по годам для выбранной профессии
+        label (str): Подпись общей динамики
+        label_vacancy (str): Подпись динамики для профессии
+        title (str): Заголовок диаграммы
+        style (dict): Размеры шрифтов
+    """
+    x = np.arange(len(dynamic.keys()))
+    width = 0.35
+    ax.bar(x - width / 2, dynamic.values(), width, label=label)
+    ax.bar(x + width / 2, dynamic_vacancy.values(), width, label=label_vacancy)
+    ax.set_title(title)
+    ax.set_xticks(x, dynamic.keys(), rotation=90)
+    if style["tick_size"] is not None:
+        ax.tick_params(labelsize=style["tick_size"])
+    ax.grid(axis='y')
+    ax.legend(fontsize=style["legend_size"])
+
+
+def draw_areas(ax, dynamics5, error, style):
+    """Рисует горизонтальную диаграмму уровня зарплат по городам
+
+    Args:
+        ax (Axes): Область диаграммы
+        dynamics5 (dict): Уровень зарплат по городам
+        error (ndarray): Длины планок погрешностей
+        style (dict): Размеры шрифтов
+    """
+    areas = [str(area).replace(' ', '\n').replace('-', '-\n') for area in dynamics5.keys()]
+    y_pos = np.arange(len(areas))
+    ax.barh(y_pos, dynamics5.values(), xerr=error, align='center')
+    if style["tick_size"] is not None:
+        ax.tick_params(labelsize=style["tick_size"])
+    ax.set_yticks(y_pos, labels=areas, size=style["area_size"])
+    ax.invert_yaxis()
+    ax.grid(axis='x')
+    ax.set_title('Уровень зарплат по городам')
+
+
+def draw_shares(ax, dynamics6):
+    """Рисует круговую диаграмму долей вакансий по городам (остальные города - доля "Другие")
+
+    Args:
+        ax (Axes): Область диаграммы
+        dynamics6 (dict): Доля вакансий по городам
+    """
+    val = list(dynamics6.values()) + [1 - sum(list(dynamics6.values()))]
+    k = list(dynamics6.keys()) + ['Другие']
+    ax.pie(val, labels=k, startangle=150)
+    ax.set_title('Доля вакансий по городам')
+
+
+def render_panel(draw_function, args, style):
+    """Рисует одну диаграмму на отдельной фигуре Agg без глобального состояния pyplot.
+    Выполняется в процессе-обработчике
+
+    Args:
+        draw_function (function): Функция рисования диаграммы, первым аргументом принимает Axes
+        args (tuple): Остальные аргументы функции рисования
+        style (dict): Размеры шрифтов
+    Returns:
+        ndarray: Пиксели диаграммы RGBA
+    """
+    with matplotlib.rc_context({'font.size': style["font_size"]}):
+        fig = Figure(figsize=PANEL_SIZE, dpi=DPI)
+        canvas = FigureCanvasAgg(fig)
+        draw_function(fig.add_subplot(), *args)
+        fig.tight_layout()
+        canvas.draw()
+    return np.asarray(canvas.buffer_rgba()).copy()
+
+
+def write_image(path, image):
+    """Записывает картинку в файл
+
+    Args:
+        path (str): Путь к png файлу
+        image (BytesIO): Картинка в формате png
+    """
+    with open(path, "wb") as file:
+        file.write(image.getvalue())
+
+
+def render_chart(name_vacancy, dynamics, image_name=None, font_size=8, tick_size=None, legend_size=8, area_size=6,
+                 cache_dir=CHARTS_DIR):
+    """Генерирует 4 диаграммы на одной картинке: уровень зарплат и количество вакансий по годам,
+    уровень зарплат и доля вакансий по городам. Диаграммы рисуются параллельно в пуле процессов
+    и складываются в сетку 2x2. Картинка сохраняется в кэш под хэшем содержимого, поэтому для тех же
+    динамик повторная отрисовка не выполняется. Для каждой профессии и оформления хранится только последняя
+    версия картинки, прежние версии удаляются при записи новой
+
+    Args:
+        name_vacancy (str): Название выбранной профессии
+        dynamics (list): Динамики dynamics1 - dynamics6
+        image_name (str): Путь к png файлу задания, None - картинка не сохраняется вне кэша
+        font_size (int): Размер шрифта диаграмм
+        tick_size (int): Размер подписей осей, None - размер шрифта диаграмм
+        legend_size (int): Размер шрифта легенды
+        area_size (int): Размер подписей городов
+        cache_dir (str): Папка с кэшем картинок
+    Returns:
+        BytesIO: Картинка в формате png, которую можно передать в pdf без чтения файла
+    """
+    style = {"font_size": font_size, "tick_size": tick_size, "legend_size": legend_size, "area_size": area_size}
+    key = get_chart_key(name_vacancy, dynamics, style)
+    prefix = get_chart_prefix(name_vacancy, style)
+    cache_path = os.path.join(cache_dir, "{0}_{1}.png".format(prefix, key))
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as file:
+            image = io.BytesIO(file.read())
+    else:
+        dynamics1, dynamics2, dynamics3, dynamics4, dynamics5, dynamics6 = dynamics
+        error = np.random.default_rng(int(key[:16], 16)).random(len(dynamics5))
+        panels = [(draw_years, (dynamics1, dynamics3, 'средняя з/п', 'з/п {0}'.format(name_vacancy),
+                                'Уровень зарплат по годам', style)),
+                  (draw_years, (dynamics2, dynamics4, 'количество вакансий',
+                                'количество вакансий {0}'.format(name_vacancy), 'Количество вакансий по годам', style)),
+                  (draw_areas, (dynamics5, error, style)),
+                  (draw_shares, (dynamics6,))]
+        images = list(get_executor().map(render_panel, [panel[0] for panel in panels], [panel[1] for panel in panels],
+                                         [style] * len(panels)))
+        image = io.BytesIO()
+        imsave(image, np.vstack([np.hstack(images[:2]), np.hstack(images[2:])]), format="png", dpi=DPI)
+        save_to_cache(cache_path, prefix, lambda path: write_image(path, image))
+
+    if image_name is not None:
+        write_image(image_name, image)
+    return image
@@ -0,0 +1,100 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+
+HEADER = "report_header"
+HEADER_PLAIN = "report_header_plain"
+CELL = "report_cell"
+PERCENT = "report_percent"
+
+
+def get_report_styles():
+    """Создает стили отчета: жирный заголовок с рамкой, жирный заголовок без рамки, ячейка с рамкой
+    и ячейка с рамкой в процентном формате
+
+    Returns:
+        list: Именованные стили
+    """
+    slim = Side(border_style='thin', color='00000000')
+    border = Border(left=slim, bottom=slim, right=slim, top=slim)
+    return [NamedStyle(HEADER, font=Font(bold=True), border=border), NamedStyle(HEADER_PLAIN, font=Font(bold=True)),
+            NamedStyle(CELL, font=DEFAULT_FONT, border=border),
+            NamedStyle(PERCENT, font=DEFAULT_FONT, border=border, number_format='0.00%')]
+
+
+def create_workbook():
+    """Создает рабочую книгу в режиме только для записи: строки сразу пишутся во временный файл,
+    а стили создаются один раз и общие для всех ячеек
+
+    Returns:
+        Workbook: Рабочая книга
+    """
+    workbook = Workbook(write_only=True)
+    for style in get_report_styles():
+        workbook.add_named_style(style)
+    return workbook
+
+
+def get_column_widths(rows):
+    """Считает ширину колонок по самому длинному значению в каждой колонке (плюс 2 символа)
+
+    Args:
+        rows (list): Строки листа
+    Returns:
+        list: Ширина каждой колонки
+    """
+    column_widths = []
+    for row in rows:
+        for i, cell in enumerate(row):
+            if len(column_widths) > i:
+                column_widths[i] = max(column_widths[i], len(str(cell)))
+            else:
+                column_widths.append(len(str(cell)))
+    return [column_width + 2 for column_width in column_widths]
+
+
+def get_styled_row(work_sheet, row, styles):
+    """Создает ячейки строки с заданными стилями
+
+    Args:
+        work_sheet (WriteOnlyWorksheet): Лист рабочей книги
+        row (list): Значения строки
+        styles (list): Название стиля для каждой колонки (None - без стиля)
+    Returns:
+        list: Ячейки строки
+    """
+    cells = []
+    for value, style in zip(row, styles):
+        cell = WriteOnlyCell(work_sheet, value)
+        if style is not None:
+            cell.style = style
+        cells.append(cell)
+    return cells
+
+
+def write_sheet(workbook, title, header, rows, column_widths, styles, header_styles=None):
+    """Добавляет лист и записывает в него строки за один проход. Строки могут быть генератором,
+    поэтому память не зависит от их количества
+
+    Args:
+        workbook (Workbook): Рабочая книга из create_workbook
+        title (str): Название листа
+        header (list): Заголовок
+        rows (iterable): Строки листа
+        column_widths (list): Ширина каждой колонки
+        styles (list): Стиль ячеек каждой колонки (None - без стиля)
+        header_styles (list): Стиль заголовка каждой колонки, по умолчанию - жирный с рамкой
+    Returns:
+        int: Количество записанных строк без заголовка
+    """
+    work_sheet = workbook.create_sheet(title)
+    for i, column_width in enumerate(column_widths, 1):
+        work_sheet.column_dimensions[get_column_letter(i)].width = column_width
+    work_sheet.append(get_styled_row(work_sheet, header, header_styles or [HEADER] * len(header)))
+    rows_count = 0
+    for row in rows:
+        work_sheet.append(get_styled_row(work_sheet, row, styles))
+        rows_count += 1
+    return rows_count
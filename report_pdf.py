@@ -0,0 +1,23 @@
+import os
+import matplotlib
+from fpdf import FPDF
+
+FONTS_DIR = os.path.join(matplotlib.get_data_path(), "fonts", "ttf")
+
+
+def write_pdf(html, file_name, images=None):
+    """Сохраняет html-отчет в pdf файл внутри процесса (без запуска wkhtmltopdf).
+    Кириллица выводится шрифтом DejaVu Sans из поставки matplotlib
+
+    Args:
+        html (str): Отчет в формате html
+        file_name (str): Название pdf файла
+        images (dict): Картинки отчета: значение атрибута src - путь к файлу или буфер BytesIO
+    """
+    images = images or {}
+    pdf = FPDF()
+    pdf.add_font("dejavu", "", os.path.join(FONTS_DIR, "DejaVuSans.ttf"))
+    pdf.add_font("dejavu", "B", os.path.join(FONTS_DIR, "DejaVuSans-Bold.ttf"))
+    pdf.add_page()
+    pdf.write_html(html, font_family="dejavu", image_map=lambda src: images.get(src, src))
+    pdf.output(file_name)
@@ -0,0 +1,76 @@
+import os
+import time
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+TEMPLATES_DIR = "."
+BYTECODE_DIR = os.path.join("data", "cache", "templates")
+PDF_TEMPLATE = "pdf_template.html"
+
+environment = None
+templates = {}
+timings = {}
+
+
+def get_environment():
+    """Возвращает общее для процесса окружение Jinja2, создавая его при первом вызове.
+    Скомпилированный код шаблонов сохраняется на диск, поэтому следующие процессы не разбирают шаблоны заново
+
+    Returns:
+        Environment: Окружение Jinja2
+    """
+    global environment
+    if environment is None:
+        os.makedirs(BYTECODE_DIR, exist_ok=True)
+        environment = Environment(loader=FileSystemLoader(TEMPLATES_DIR),
+                                  bytecode_cache=FileSystemBytecodeCache(BYTECODE_DIR), auto_reload=False)
+    return environment
+
+
+def get_template(template_name=PDF_TEMPLATE):
+    """Возвращает скомпилированный шаблон, загружая его один раз за процесс
+
+    Args:
+        template_name (str): Название файла шаблона
+    Returns:
+        Template: Шаблон
+    """
+    if template_name not in templates:
+        start_time = time.perf_counter()
+        templates[template_name] = get_environment().get_template(template_name)
+        timings[template_name] = {"load": time.perf_counter() - start_time, "renders": 0, "render_time": 0.0}
+    return templates[template_name]
+
+
+def render_template(context, template_name=PDF_TEMPLATE):
+    """Заполняет шаблон и учитывает время заполнения
+
+    Args:
+        context (dict): Переменные шаблона
+        template_name (str): Название файла шаблона
+    Returns:
+        str: Заполненный шаблон
+    """
+    template = get_template(template_name)
+    start_time = time.perf_counter()
+    result = template.render(context)
+    timings[template_name]["renders"] += 1
+    timings[template_name]["render_time"] += time.perf_counter() - start_time
+    return result
+
+
+def get_render_timings():
+    """Возвращает время загрузки шаблонов и суммарное время их заполнения в текущем процессе
+
+    Returns:
+        dict: Для каждого шаблона - время загрузки (load), количество заполнений (renders)
+        и их суммарное время (render_time) в секундах
+    """
+    return {name: dict(timing) for name, timing in timings.items()}
+
+
+def print_render_timings():
+    """Печатает время загрузки и среднее время заполнения шаблонов
+    """
+    for name, timing in timings.items():
+        print('Шаблон {0}: загрузка {1:.4f} с, заполнений: {2}, в среднем {3:.4f} с'.format(
+            name, timing["load"], timing["renders"], timing["render_time"] / max(timing["renders"], 1)))
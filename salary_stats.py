@@ -0,0 +1,179 @@
+import math
+import pandas as pd
+
+
+class SalaryStats:
+    """Класс частичного агрегата зарплат: количество вакансий и зарплат, сумма, минимум и максимум.
+
+    Агрегаты можно объединять методом merge в любом порядке. Зарплаты без перевода валют (средние
+    значения salary_from и salary_to) кратны 0.5 и суммируются в float точно, поэтому статистики,
+    посчитанные по частям файла, по файлам за годы или в разных процессах, совпадают с последовательным подсчетом
+
+    Attributes:
+        number (int): Количество вакансий
+        count (int): Количество вакансий с указанной зарплатой
+        total (float): Сумма зарплат
+        minimum (float): Минимальная зарплата
+        maximum (float): Максимальная зарплата
+    """
+    __slots__ = ("number", "count", "total", "minimum", "maximum")
+
+    def __init__(self, number=0, count=0, total=0.0, minimum=math.inf, maximum=-math.inf):
+        """Инициализирует объект SalaryStats.
+
+        Args:
+            number (int): Количество вакансий
+            count (int): Количество вакансий с указанной зарплатой
+            total (float): Сумма зарплат
+            minimum (float): Минимальная зарплата
+            maximum (float): Максимальная зарплата
+        """
+        self.number, self.count, self.total = number, count, total
+        self.minimum, self.maximum = minimum, maximum
+
+    @classmethod
+    def from_series(cls, salaries):
+        """Создает агрегат по колонке зарплат
+
+        Args:
+            salaries (Series): Зарплаты вакансий (NaN, если зарплата не указана)
+        Returns:
+            SalaryStats: Агрегат зарплат
+        """
+        values = salaries.dropna()
+        if len(values) == 0:
+            return cls(number=len(salaries))
+        return cls(len(salaries), len(values), float(values.sum()), float(values.min()), float(values.max()))
+
+    def add(self, salary):
+        """Учитывает одну вакансию
+
+        Args:
+            salary (float): Средняя зарплата вакансии (None или NaN, если зарплата не указана)
+        """
+        self.number += 1
+        if salary is not None and not math.isnan(salary):
+            self.count += 1
+            self.total += salary
+            self.minimum = min(self.minimum, salary)
+            self.maximum = max(self.maximum, salary)
+
+    def merge(self, other):
+        """Добавляет к агрегату другой агрегат
+
+        Args:
+            other (SalaryStats): Агрегат другой части данных
+        Returns:
+            SalaryStats: Этот же агрегат
+        """
+        self.number += other.number
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        return self
+
+    def average(self):
+        """Высчитывает среднюю зарплату
+
+        Returns:
+            int: Средняя зарплата, 0 - если зарплаты не указаны
+        """
+        return int(self.total / self.count) if self.count != 0 else 0
+
+    def __eq__(self, other):
+        return isinstance(other, SalaryStats) and all(getattr(self, attribute) == getattr(other, attribute)
+                                                      for attribute in self.__slots__)
+
+    def __repr__(self):
+        return "SalaryStats(number={0}, count={1}, total={2}, minimum={3}, maximum={4})"\
+            .format(self.number, self.count, self.total, self.minimum, self.maximum)
+
+
+def add_salary(statistic, key, salary):
+    """Учитывает вакансию в словаре агрегатов
+
+    Args:
+        statistic (dict): Агрегаты по году или городу
+        key (int or str): Год или город вакансии
+        salary (float): Средняя зарплата вакансии
+    """
+    if key not in statistic:
+        statistic[key] = SalaryStats()
+    statistic[key].add(salary)
+
+
+def merge_statistics(statistics):
+    """Объединяет словари агрегатов, посчитанных для разных частей данных
+
+    Args:
+        statistics (list): Список словарей с агрегатами
+    Returns:
+        dict: Объединенные агрегаты
+    """
+    result = {}
+    for statistic in statistics:
+        for key, stats in statistic.items():
+            if key not in result:
+                result[key] = SalaryStats()
+            result[key].merge(stats)
+    return result
+
+
+def get_python_value(value):
+    """Переводит скаляр numpy в значение встроенного типа python
+
+    Args:
+        value (object): Значение ключа группировки
+    Returns:
+        object: Значение встроенного типа
+    """
+    return value.item() if hasattr(value, "item") else value
+
+
+def get_statistic_by(data_of_file, column):
+    """Группирует вакансии и считает агрегат зарплат для каждой группы
+
+    Args:
+        data_of_file (DataFrame): Вакансии с колонкой salary
+        column (str or list): Колонка или список колонок для группировки
+    Returns:
+        dict: Агрегаты по значениям колонки (по кортежам значений для списка колонок)
+    """
+    grouped = data_of_file.groupby(column, observed=True)["salary"].agg(["size", "count", "sum", "min", "max"])
+    result = {}
+    for key, number, count, total, minimum, maximum in zip(grouped.index, grouped["size"], grouped["count"],
+                                                            grouped["sum"], grouped["min"], grouped["max"]):
+        if count == 0:
+            minimum, maximum = math.inf, -math.inf
+        key = tuple(get_python_value(value) for value in key) if isinstance(key, tuple) else get_python_value(key)
+        result[key] = SalaryStats(int(number), int(count), float(total), float(minimum), float(maximum))
+    return result
+
+
+def get_city_dynamics(cities):
+    """Получает статистики по городам: уровень зарплат и долю вакансий для городов,
+    в которых больше 1% вакансий. Сортировка и округление выполняются теми же операциями pandas,
+    что и при подсчете по строкам файла (города в алфавитном порядке, sort_values, округление numpy),
+    поэтому порядок городов с равными значениями и округление долей совпадают с ним
+
+    Args:
+        cities (dict): Агрегаты зарплат по городам
+    Returns:
+        dict, dict: Уровень зарплат по городам (в порядке убывания), доля вакансий по городам (в порядке убывания)
+    """
+    total = sum(stats.number for stats in cities.values())
+    area_names = sorted(area_name for area_name, stats in cities.items() if stats.number > total * 0.01)
+    data_of_cities = pd.DataFrame({
+        "area_name": area_names,
+        "salary": [cities[area_name].total / cities[area_name].count if cities[area_name].count != 0 else 0.0
+                   for area_name in area_names],
+        "count": [float(cities[area_name].number) for area_name in area_names]})
+    data_of_cities = data_of_cities.sort_values("salary", ascending=False)
+    data_of_cities["salary"] = data_of_cities["salary"].apply(lambda s: int(s))
+    dynamics5 = dict(zip(data_of_cities.head(10)["area_name"].tolist(), data_of_cities.head(10)["salary"].tolist()))
+
+    data_of_cities = data_of_cities.sort_values("count", ascending=False)
+    data_of_cities["count"] = round(data_of_cities["count"] / total, 4)
+    dynamics6 = dict(zip(data_of_cities.head(10)["area_name"].tolist(), data_of_cities.head(10)["count"].tolist()))
+    return dynamics5, dynamics6
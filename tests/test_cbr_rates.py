@@ -0,0 +1,120 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.parsers.expat import ExpatError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cbr_rates import get_rates
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "XML_daily.xml")
+
+
+class CbrHandler(BaseHTTPRequestHandler):
+    """Локальная замена XML_daily.asp: отдает записанный ответ центробанка на любую дату.
+    Для даты из failures сначала отдается заданное количество ответов 503, для даты из broken - не XML
+    """
+    failures = {}
+    broken = set()
+    requests_count = {}
+
+    def do_GET(self):
+        date = parse_qs(urlparse(self.path).query)["date_req"][0]
+        self.requests_count[date] = self.requests_count.get(date, 0) + 1
+        if self.failures.get(date, 0) > 0:
+            self.failures[date] -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        if date in self.broken:
+            content = b"Service Unavailable"
+        else:
+            with open(FIXTURE, "rb") as file:
+                content = file.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GetRatesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CbrHandler)
+        cls.base_url = "http://127.0.0.1:{0}/scripts/XML_daily.asp".format(cls.server.server_address[1])
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        CbrHandler.failures, CbrHandler.broken, CbrHandler.requests_count = {}, set(), {}
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+
+    def get_rates(self, first_month, last_month, retries=3):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            result = get_rates(first_month, last_month, ["USD", "KZT"], previous_rates={"BYR": 0.0302},
+                               base_url=self.base_url, cache_dir=self.cache_dir.name, workers=2, retries=retries,
+                               backoff_factor=0)
+        return result, output.getvalue()
+
+    def test_parses_rates_per_unit(self):
+        result, _ = self.get_rates("2019-12", "2020-01")
+        self.assertEqual(result["date"].tolist(), ["2019-12", "2020-01"])
+        self.assertEqual(result["USD"].tolist(), [61.9057, 61.9057])
+        self.assertEqual(result["KZT"].tolist(), [0.16195, 0.16195])
+        self.assertEqual(result["BYR"].tolist(), [0.0302, 0.0302])
+        self.assertNotIn("EUR", result.columns)
+
+    def test_retries_server_errors(self):
+        CbrHandler.failures = {"01/01/2020": 2}
+        result, output = self.get_rates("2020-01", "2020-01")
+        self.assertEqual(result["date"].tolist(), ["2020-01"])
+        self.assertEqual(CbrHandler.requests_count["01/01/2020"], 3)
+        self.assertEqual(output, "")
+
+    def test_reads_cached_months(self):
+        first, _ = self.get_rates("2019-11", "2020-01")
+        self.assertEqual(sorted(os.listdir(self.cache_dir.name)), ["2019-11.xml", "2019-12.xml", "2020-01.xml"])
+        requests_count = dict(CbrHandler.requests_count)
+        second, _ = self.get_rates("2019-11", "2020-01")
+        self.assertEqual(CbrHandler.requests_count, requests_count)
+        self.assertTrue(first.equals(second))
+
+    def test_reports_failed_month_and_fetches_it_again(self):
+        CbrHandler.failures = {"01/12/2019": 10}
+        result, output = self.get_rates("2019-11", "2020-01", retries=2)
+        self.assertEqual(result["date"].tolist(), ["2019-11", "2020-01"])
+        self.assertEqual(CbrHandler.requests_count["01/12/2019"], 3)
+        self.assertIn("2019-12", output)
+        self.assertNotIn("2019-12.xml", os.listdir(self.cache_dir.name))
+
+        CbrHandler.failures = {}
+        result, output = self.get_rates("2019-11", "2020-01")
+        self.assertEqual(result["date"].tolist(), ["2019-11", "2019-12", "2020-01"])
+        self.assertEqual(CbrHandler.requests_count["01/12/2019"], 4)
+        self.assertEqual(output, "")
+
+    def test_raises_on_invalid_response(self):
+        CbrHandler.broken = {"01/01/2020"}
+        with self.assertRaises(ExpatError):
+            self.get_rates("2020-01", "2020-01")
+        self.assertEqual(os.listdir(self.cache_dir.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import datetime
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from hh_harvester import DATE_FORMAT, HH_TIMEZONE, MAX_FOUND, get_range_windows, harvest_vacancies
+
+
+def get_items(day, dense_count, sparse_step):
+    """Создает вакансии за сутки: dense_count вакансий по одной в секунду с 03:00 и по одной каждые
+    sparse_step минут в течение суток
+    """
+    start = datetime.datetime.fromisoformat(day).replace(tzinfo=HH_TIMEZONE)
+    times = [start + datetime.timedelta(hours=3, seconds=i) for i in range(dense_count)] + \
+            [start + datetime.timedelta(minutes=minute, seconds=30) for minute in range(0, 24 * 60, sparse_step)]
+    return [{"name": "Вакансия {0} {1}".format(day, i), "area": {"name": "Москва"},
+             "salary": {"from": 1000 + i, "to": None, "currency": "RUR"} if i % 2 else None,
+             "published_at": published_at.strftime(DATE_FORMAT), "_time": published_at}
+            for i, published_at in enumerate(sorted(times, reverse=True))]
+
+
+class HhHandler(BaseHTTPRequestHandler):
+    """Локальная замена api.hh.ru/vacancies: отдает вакансии окна по сто на странице, не больше MAX_FOUND
+    на окно, как настоящий api. Страницы окон, начинающихся с даты из broken, отвечают ошибкой 400
+    """
+    items = []
+    broken = set()
+    requests_count = 0
+
+    def do_GET(self):
+        HhHandler.requests_count += 1
+        query = dict((key, value[0]) for key, value in parse_qs(urlparse(self.path).query).items())
+        if query["date_from"] in self.broken and query["page"] != "0":
+            self.send_json(400, {"errors": [{"type": "bad_argument"}]})
+            return
+        date_from, date_to = [datetime.datetime.strptime(query[key], DATE_FORMAT) for key in ("date_from", "date_to")]
+        found = [item for item in self.items if date_from <= item["_time"] <= date_to]
+        page, per_page = int(query["page"]), int(query["per_page"])
+        items = [dict((key, value) for key, value in item.items() if key != "_time")
+                 for item in found[:MAX_FOUND][page * per_page:(page + 1) * per_page]]
+        self.send_json(200, {"items": items, "found": len(found), "page": page, "per_page": per_page,
+                             "pages": min(math.ceil(len(found) / per_page), MAX_FOUND // per_page)})
+
+    def send_json(self, status, obj):
+        content = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HarvestVacanciesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), HhHandler)
+        cls.base_url = "http://127.0.0.1:{0}/vacancies".format(cls.server.server_address[1])
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        HhHandler.items = get_items("2022-12-21", 2500, 10) + get_items("2022-12-22", 0, 30)
+        HhHandler.broken, HhHandler.requests_count = set(), 0
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.output_name = os.path.join(directory.name, "hh_vacancies.csv")
+
+    def harvest(self, first_day, last_day):
+        harvest_vacancies(self.output_name, get_range_windows(first_day, last_day), self.base_url, workers=2,
+                          requests_per_second=1000)
+
+    def get_names(self, day):
+        return sorted(item["name"] for item in HhHandler.items if item["published_at"].startswith(day))
+
+    def assert_output(self, names):
+        data_file = pd.read_csv(self.output_name)
+        self.assertEqual(sorted(data_file["name"]), names)
+        self.assertFalse(data_file.duplicated().any())
+        self.assertFalse(os.path.exists(self.output_name + ".checkpoint"))
+
+    def test_splits_windows_over_limit(self):
+        self.harvest("2022-12-21", "2022-12-21")
+        self.assert_output(self.get_names("2022-12-21"))
+
+    def test_resumes_after_interrupted_run(self):
+        self.harvest("2022-12-21", "2022-12-21")
+        full_requests_count = HhHandler.requests_count
+        os.remove(self.output_name)
+
+        HhHandler.broken = {"2022-12-21T03:00:00+0300"}
+        with self.assertRaises(requests.HTTPError):
+            self.harvest("2022-12-21", "2022-12-21")
+        self.assertTrue(os.path.exists(self.output_name + ".checkpoint"))
+        written = len(pd.read_csv(self.output_name))
+        self.assertGreater(written, 0)
+
+        HhHandler.broken, HhHandler.requests_count = set(), 0
+        self.harvest("2022-12-21", "2022-12-21")
+        self.assert_output(self.get_names("2022-12-21"))
+        self.assertLess(HhHandler.requests_count, full_requests_count)
+
+    def test_discards_checkpoint_of_other_range(self):
+        HhHandler.broken = {"2022-12-21T03:00:00+0300"}
+        with self.assertRaises(requests.HTTPError):
+            self.harvest("2022-12-21", "2022-12-21")
+
+        HhHandler.broken = set()
+        self.harvest("2022-12-22", "2022-12-22")
+        self.assert_output(self.get_names("2022-12-22"))
+
+
+if __name__ == '__main__':
+    unittest.main()
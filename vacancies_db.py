@@ -0,0 +1,184 @@
+import itertools
+import math
+import os
+import sqlite3
+from salary_stats import SalaryStats
+
+VACANCIES_TABLE = "vacancies"
+
+
+def connect_for_load(db_name):
+    """Открывает базу данных для массовой загрузки: журнал WAL, без синхронизации с диском
+    после каждой записи, транзакции управляются явно. После загрузки соединение закрывается через close_after_load
+
+    Args:
+        db_name (str): Путь к базе данных
+    Returns:
+        Connection: Соединение с базой данных
+    """
+    cnx = sqlite3.connect(db_name, isolation_level=None)
+    cnx.execute("PRAGMA journal_mode=WAL")
+    cnx.execute("PRAGMA synchronous=OFF")
+    return cnx
+
+
+def close_after_load(cnx):
+    """Переносит журнал WAL в базу данных, возвращает обычный режим журнала и закрывает соединение,
+    поэтому после загрузки рядом с базой не остаются файлы -wal и -shm, а режим WAL не сохраняется в файле базы
+
+    Args:
+        cnx (Connection): Соединение из connect_for_load после завершения транзакции загрузки
+    """
+    cnx.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    cnx.execute("PRAGMA journal_mode=DELETE")
+    cnx.close()
+
+
+def create_vacancies_table(cnx, table=VACANCIES_TABLE):
+    """Пересоздает таблицу вакансий с типизированными колонками
+
+    Args:
+        cnx (Connection): Соединение с базой данных
+        table (str): Название таблицы
+    """
+    cnx.execute('DROP TABLE IF EXISTS "{0}"'.format(table))
+    cnx.execute('CREATE TABLE "{0}" ("name" TEXT, "salary" REAL, "area_name" TEXT, "published_at" TEXT, '
+                '"year" INTEGER)'.format(table))
+
+
+def create_vacancies_indexes(cnx, table=VACANCIES_TABLE):
+    """Создает индексы по году, городу и названию вакансии для запросов статистик
+
+    Args:
+        cnx (Connection): Соединение с базой данных
+        table (str): Название таблицы
+    """
+    for column in ("year", "area_name", "name"):
+        cnx.execute('CREATE INDEX IF NOT EXISTS "{0}_{1}" ON "{0}" ("{1}")'.format(table, column))
+
+
+def get_column_values(column):
+    """Переводит колонку в список значений python (NaN заменяется на None)
+
+    Args:
+        column (Series): Колонка
+    Returns:
+        list: Значения колонки
+    """
+    return column.astype(object).where(column.notna(), None).tolist()
+
+
+def get_vacancy_rows(data_file):
+    """Переводит вакансии в кортежи для вставки (год берется из даты публикации)
+
+    Args:
+        data_file (DataFrame): Вакансии с колонками name, salary, area_name, published_at
+    Returns:
+        zip: Кортежи (name, salary, area_name, published_at, year)
+    """
+    return zip(get_column_values(data_file["name"]), get_column_values(data_file["salary"]),
+               get_column_values(data_file["area_name"]), data_file["published_at"].tolist(),
+               data_file["published_at"].str[:4].astype(int).tolist())
+
+
+def insert_vacancies(cnx, data_file, batch_size=50000, table=VACANCIES_TABLE):
+    """Добавляет вакансии в таблицу пачками через executemany
+
+    Args:
+        cnx (Connection): Соединение с базой данных
+        data_file (DataFrame): Вакансии с колонками name, salary, area_name, published_at
+        batch_size (int): Количество строк в одной пачке
+        table (str): Название таблицы
+    """
+    query = 'INSERT INTO "{0}" ("name", "salary", "area_name", "published_at", "year") VALUES (?, ?, ?, ?, ?)'\
+        .format(table)
+    rows = get_vacancy_rows(data_file)
+    batch = list(itertools.islice(rows, batch_size))
+    while batch:
+        cnx.executemany(query, batch)
+        batch = list(itertools.islice(rows, batch_size))
+
+
+def load_vacancies(db_name, data_file, batch_size=50000, table=VACANCIES_TABLE):
+    """Загружает вакансии в базу данных одной транзакцией: пересоздает таблицу, вставляет строки пачками
+    и после вставки строит индексы
+
+    Args:
+        db_name (str): Путь к базе данных
+        data_file (DataFrame): Вакансии с колонками name, salary, area_name, published_at
+        batch_size (int): Количество строк в одной пачке
+        table (str): Название таблицы
+    """
+    cnx = connect_for_load(db_name)
+    with cnx:
+        cnx.execute("BEGIN")
+        create_vacancies_table(cnx, table)
+        insert_vacancies(cnx, data_file, batch_size, table)
+        create_vacancies_indexes(cnx, table)
+    close_after_load(cnx)
+
+
+def is_database(path_to_file):
+    """Проверяет, что путь указывает на базу данных SQLite, а не на csv-файл
+
+    Args:
+        path_to_file (str): Путь к входному файлу
+    Returns:
+        bool: True, если это файл .db
+    """
+    return os.path.splitext(path_to_file)[1].lower() in (".db", ".sqlite", ".sqlite3")
+
+
+def lower(text):
+    """Переводит строку в нижний регистр с учетом юникода (встроенная lower в SQLite работает только с ASCII)
+
+    Args:
+        text (str): Строка
+    Returns:
+        str: Строка в нижнем регистре
+    """
+    return text.lower() if isinstance(text, str) else text
+
+
+def connect(db_name):
+    """Открывает базу данных вакансий для запросов статистик
+
+    Args:
+        db_name (str): Путь к базе данных
+    Returns:
+        Connection: Соединение с базой данных с функцией py_lower
+    """
+    cnx = sqlite3.connect(db_name)
+    cnx.create_function("py_lower", 1, lower, deterministic=True)
+    return cnx
+
+
+def get_statistic_from_db(cnx, column, name_vacancy=None, area_name=None, case=True, table=VACANCIES_TABLE):
+    """Группирует вакансии запросом GROUP BY и считает агрегат зарплат для каждой группы
+
+    Args:
+        cnx (Connection): Соединение из connect
+        column (str or list): Колонка для группировки (year или area_name) или список колонок
+        name_vacancy (str): Подстрока названия профессии, None - все вакансии
+        area_name (str): Подстрока названия региона, None - все регионы
+        case (bool): Учитывать регистр в названии профессии
+        table (str): Название таблицы
+    Returns:
+        dict: Агрегаты SalaryStats по значениям колонки (по кортежам значений для списка колонок)
+    """
+    columns = ", ".join('"{0}"'.format(name) for name in ([column] if isinstance(column, str) else column))
+    conditions, parameters = [], []
+    if name_vacancy is not None:
+        conditions.append('instr("name", ?) > 0' if case else 'instr(py_lower("name"), ?) > 0')
+        parameters.append(name_vacancy if case else name_vacancy.lower())
+    if area_name is not None:
+        conditions.append('instr("area_name", ?) > 0')
+        parameters.append(area_name)
+    query = 'SELECT {0}, COUNT(*), COUNT("salary"), TOTAL("salary"), MIN("salary"), MAX("salary") FROM "{1}"{2} ' \
+            'GROUP BY {0}'.format(columns, table, " WHERE " + " AND ".join(conditions) if conditions else "")
+    result = {}
+    for row in cnx.execute(query, parameters):
+        key, (number, count, total, minimum, maximum) = row[:-5], row[-5:]
+        result[key[0] if isinstance(column, str) else key] = SalaryStats(
+            number, count, total, math.inf if minimum is None else minimum, -math.inf if maximum is None else maximum)
+    return result
@@ -0,0 +1,237 @@
+import csv
+import hashlib
+import math
+import os
+import time
+import pandas as pd
+from salary_stats import add_salary
+
+CACHE_DIR = os.path.join("data", "cache")
+
+vacancies_dtypes = {"name": "object", "salary_from": "float64", "salary_to": "float64",
+                    "salary_currency": "category", "area_name": "category", "published_at": "object"}
+
+
+def get_cache_path(path_to_file, cache_dir=CACHE_DIR, extension="feather"):
+    """Возвращает путь к кэшу csv-файла. Ключ кэша - путь к файлу, время изменения и размер
+
+    Args:
+        path_to_file (str): Путь к входному csv-файлу
+        cache_dir (str): Папка с кэшем
+        extension (str): Расширение файла кэша
+    Returns:
+        str, str: Путь к файлу кэша, префикс всех версий кэша этого файла
+    """
+    stat = os.stat(path_to_file)
+    prefix = hashlib.md5(os.path.abspath(path_to_file).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, "{0}_{1}_{2}.{3}".format(prefix, stat.st_mtime_ns, stat.st_size, extension)), prefix
+
+
+def save_to_cache(cache_path, prefix, save_function):
+    """Сохраняет новую версию кэша: файл пишется во временный и атомарно переименовывается,
+    поэтому читатели видят либо старую, либо полностью записанную версию. Устаревшие версии
+    с тем же префиксом и расширением удаляются только после этого; версии, открытые другими
+    процессами и не удаляемые в Windows, остаются до следующей записи
+
+    Args:
+        cache_path (str): Путь к файлу кэша
+        prefix (str): Префикс всех версий кэша этого файла
+        save_function (function): Функция, записывающая кэш по переданному пути
+    """
+    cache_dir, extension = os.path.dirname(cache_path), os.path.splitext(cache_path)[1]
+    os.makedirs(cache_dir, exist_ok=True)
+    temporary_path = "{0}.{1}.tmp".format(cache_path, os.getpid())
+    try:
+        save_function(temporary_path)
+        os.replace(temporary_path, cache_path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    for file_name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, file_name)
+        if file_name.startswith(prefix + "_") and file_name.endswith(extension) and path != cache_path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def read_vacancies(path_to_file, cache_dir=CACHE_DIR):
+    """Считывает вакансии из csv-файла через колоночный кэш в формате Feather.
+    При первом чтении файл разбирается и сохраняется в кэш с типизированными колонками
+    (категориальные area_name и salary_currency, целый year, вещественные зарплаты),
+    при повторных - читается только кэш. Если csv-файл изменился, кэш пересоздается.
+    Для файлов, которые пересоздаются при каждом запуске (файлы по годам), кэш не нужен
+
+    Args:
+        path_to_file (str): Путь к входному csv-файлу
+        cache_dir (str): Папка с кэшем, None - читать csv-файл без кэша
+    Returns:
+        DataFrame: Вакансии с дополнительной колонкой year
+    """
+    if cache_dir is not None:
+        cache_path, prefix = get_cache_path(path_to_file, cache_dir)
+        try:
+            return pd.read_feather(cache_path)
+        except FileNotFoundError:
+            pass
+
+    data_of_file = pd.read_csv(path_to_file, dtype=vacancies_dtypes)
+    data_of_file["year"] = data_of_file["published_at"].str[:4].astype("int32")
+
+    if cache_dir is not None:
+        save_to_cache(cache_path, prefix, data_of_file.to_feather)
+    return data_of_file
+
+
+def split_csv_by_year(path_to_file, output_dir, chunksize=100000):
+    """Разделяет входной файл на меньшие по годам за один проход, не загружая его в память целиком.
+    Файл читается частями по chunksize строк, строки каждой части дописываются в открытые файлы
+    year_number_{год}.csv, поэтому пиковая память ограничена размером части
+
+    Args:
+        path_to_file (str): Путь к входному csv-файлу
+        output_dir (str): Папка для файлов по годам
+        chunksize (int): Количество строк в одной части
+    """
+    files = {}
+    try:
+        for chunk in pd.read_csv(path_to_file, chunksize=chunksize, dtype=str, keep_default_na=False):
+            for year, data in chunk[list(vacancies_dtypes)].groupby(chunk["published_at"].str[:4]):
+                header = year not in files
+                if header:
+                    files[year] = open(os.path.join(output_dir, "year_number_{0}.csv".format(year)),
+                                       mode="w", encoding="utf-8", newline="")
+                data.to_csv(files[year], index=False, header=header)
+    finally:
+        for file in files.values():
+            file.close()
+
+
+def get_header(path_to_file):
+    """Считывает заголовок csv-файла
+
+    Args:
+        path_to_file (str): Путь к входному csv-файлу
+    Returns:
+        list, int: Названия колонок, позиция в байтах, с которой начинаются данные
+    """
+    with open(path_to_file, mode="rb") as file:
+        line = file.readline()
+        return next(csv.reader([line.decode("utf-8-sig")])), file.tell()
+
+
+def count_quotes(path_to_file, start, end, block_size=1 << 24):
+    """Считает количество кавычек в диапазоне байт файла
+
+    Args:
+        path_to_file (str): Путь к входному csv-файлу
+        start (int): Начало диапазона в байтах
+        end (int): Конец диапазона в байтах
+        block_size (int): Размер блока чтения
+    Returns:
+        int: Количество кавычек
+    """
+    quotes = 0
+    with open(path_to_file, mode="rb") as file:
+        file.seek(start)
+        while start < end:
+            block = file.read(min(block_size, end - start))
+            if not block:
+                break
+            quotes += block.count(b'"')
+            start += len(block)
+    return quotes
+
+
+def get_byte_ranges(path_to_file, parts, map_function=map):
+    """Разбивает данные csv-файла на parts диапазонов байт, границы которых совпадают с началом записей.
+    Граница сдвигается на ближайший перевод строки, перед которым четное количество кавычек,
+    поэтому перевод строки внутри поля в кавычках не считается концом записи
+
+    Args:
+        path_to_file (str): Путь к входному csv-файлу
+        parts (int): Желаемое количество диапазонов
+        map_function (function): Функция map для параллельного подсчета кавычек, например executor.map
+    Returns:
+        list: Список пар (начало, конец) в байтах
+    """
+    _, start = get_header(path_to_file)
+    size = os.path.getsize(path_to_file)
+    raw_bounds = [start + (size - start) * part // parts for part in range(parts + 1)]
+    quotes = list(map_function(count_quotes, [path_to_file] * parts, raw_bounds[:-1], raw_bounds[1:]))
+
+    bounds = [start]
+    with open(path_to_file, mode="rb") as file:
+        for part in range(1, parts):
+            parity = sum(quotes[:part]) % 2
+            file.seek(raw_bounds[part])
+            line = file.readline()
+            parity = (parity + line.count(b'"')) % 2
+            while line and parity != 0:
+                line = file.readline()
+                parity = (parity + line.count(b'"')) % 2
+            if bounds[-1] < file.tell() < size:
+                bounds.append(file.tell())
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def read_byte_range_lines(path_to_file, start, end):
+    """Построчно читает диапазон байт файла, останавливаясь на его конце, поэтому в памяти
+    находится только текущая строка, а не весь диапазон
+
+    Args:
+        path_to_file (str): Путь к входному csv-файлу
+        start (int): Начало диапазона в байтах (начало записи)
+        end (int): Конец диапазона в байтах (начало записи)
+    Returns:
+        str: Очередная строка файла с переводом строки
+    """
+    with open(path_to_file, mode="rb") as file:
+        file.seek(start)
+        while start < end:
+            line = file.readline()
+            if not line:
+                break
+            start += len(line)
+            yield line.decode("utf-8")
+
+
+def aggregate_byte_range(path_to_file, start, end, name_vacancy):
+    """Считает агрегаты зарплат по годам, городам и годам для выбранной профессии для диапазона байт файла
+
+    Args:
+        path_to_file (str): Путь к входному csv-файлу
+        start (int): Начало диапазона в байтах
+        end (int): Конец диапазона в байтах
+        name_vacancy (str): Название выбранной профессии
+    Returns:
+        dict, dict, dict: Агрегаты SalaryStats по годам, по городам, по годам для выбранной профессии
+    """
+    header, _ = get_header(path_to_file)
+    name, salary_from, salary_to, area_name, published_at = [header.index(column) for column in
+                                                             ("name", "salary_from", "salary_to", "area_name", "published_at")]
+    years, cities, years_vacancy = {}, {}, {}
+    for row in csv.reader(read_byte_range_lines(path_to_file, start, end)):
+        if len(row) != len(header):
+            continue
+        salaries = [float(row[column]) for column in (salary_from, salary_to) if row[column] != ""]
+        salary = sum(salaries) / len(salaries) if salaries else math.nan
+        year = int(row[published_at][:4])
+        add_salary(years, year, salary)
+        add_salary(cities, row[area_name], salary)
+        if name_vacancy in row[name]:
+            add_salary(years_vacancy, year, salary)
+    return years, cities, years_vacancy
+
+
+def print_progress(rows_count, start_time):
+    """Печатает количество обработанных вакансий и скорость обработки
+
+    Args:
+        rows_count (int): Количество обработанных вакансий
+        start_time (float): Время начала обработки (time.perf_counter)
+    """
+    elapsed = time.perf_counter() - start_time
+    print("Обработано вакансий: {0}, {1:.0f} вакансий/с".format(rows_count, rows_count / elapsed if elapsed > 0 else 0))
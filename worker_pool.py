@@ -0,0 +1,40 @@
+import atexit
+import concurrent.futures as con_fut
+import os
+
+executor = None
+
+
+def get_workers_count():
+    """Возвращает количество рабочих процессов: значение переменной окружения VACANCIES_WORKERS
+    или количество ядер процессора
+
+    Returns:
+        int: Количество процессов
+    """
+    return int(os.environ.get("VACANCIES_WORKERS", 0)) or os.cpu_count() or 1
+
+
+def get_executor():
+    """Возвращает общий для всех отчетов ProcessPoolExecutor, создавая его при первом вызове.
+    Это единственный пул процессов, поэтому количество рабочих процессов не превышает get_workers_count
+
+    Returns:
+        ProcessPoolExecutor: Пул процессов concurrent.futures
+    """
+    global executor
+    if executor is None:
+        executor = con_fut.ProcessPoolExecutor(max_workers=get_workers_count())
+    return executor
+
+
+def shutdown():
+    """Закрывает пул процессов и дожидается завершения рабочих процессов
+    """
+    global executor
+    if executor is not None:
+        executor.shutdown()
+        executor = None
+
+
+atexit.register(shutdown)